@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Serve the recorded fixtures in place of github.com for load tests.
+
+Trending pages are served from `trending_repositories[_<language>][_<since>].html`
+falling back to the closest recorded page, developer pages from
+`trending_developers.html`, and raw README paths `/<user>/<repository>/master/README.md`
+from the sample READMEs. Every response carries an ETag and honours
+If-None-Match, so the HTTP cache can be exercised too.
+
+Latency, throttling and slow bodies are injected deterministically, so runs
+of the same load are comparable:
+
+    $ python benchmarks/fake_github.py --latency 0.05 --throttle-every 5 --drip-rate 65536
+    $ export GITHUB_TRENDING_BASE_URL=http://127.0.0.1:8765/
+    $ export GITHUB_TRENDING_README_URL='http://127.0.0.1:8765/{repository}/{branch}/{name}'
+    $ gt trend
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import argparse
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+import zlib
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, unquote, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+    from urlparse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEVELOPERS_PAGE = 'trending_developers.html'
+REPOSITORIES_PAGE = 'trending_repositories{0}.html'
+READMES = [
+    'readme_english.md',
+    'readme_cjk.md',
+]
+README_BRANCH = 'master'
+README_NAME = 'readme.md'
+HOST = '127.0.0.1'
+PORT = 8765
+
+
+class FakeGithubServer(ThreadingMixIn, HTTPServer):
+    """Serve the fixtures with the injected latency, throttling and drip.
+
+    :type latency: float
+    :param latency: The seconds every response is delayed by.
+
+    :type throttle_every: int
+    :param throttle_every: Answer every Nth request with 429, 0 to never.
+
+    :type retry_after: int
+    :param retry_after: The Retry-After seconds sent with a 429.
+
+    :type drip_rate: int
+    :param drip_rate: The bytes per second bodies are sent at, 0 for full
+        speed.
+
+    :type drip_chunk: int
+    :param drip_chunk: The bytes written at a time when dripping.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency=0, throttle_every=0, retry_after=1,
+                 drip_rate=0, drip_chunk=1024):
+        HTTPServer.__init__(self, address, FakeGithubHandler)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.drip_rate = drip_rate
+        self.drip_chunk = drip_chunk
+        self.fixtures = {}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'throttled': 0, 'not_modified': 0, 'not_found': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+            return self.stats[key]
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a slow body are expected under load.
+        if not isinstance(sys.exc_info()[1], (IOError, OSError)):
+            HTTPServer.handle_error(self, request, client_address)
+
+    def read_fixture(self, file_name):
+        """Read a fixture once, with its ETag.
+
+        :return: The body and its ETag, None if there is no such fixture.
+        """
+        if file_name not in self.fixtures:
+            path = os.path.join(FIXTURES_DIR, file_name)
+            if not os.path.isfile(path):
+                return None
+            with io.open(path, 'rb') as fixture:
+                body = fixture.read()
+            etag = '"{0}"'.format(hashlib.sha1(body).hexdigest())
+            self.fixtures[file_name] = (body, etag)
+        return self.fixtures[file_name]
+
+    def find_trending_page(self, parts, since):
+        """Find the recorded page closest to a trending url."""
+        if parts[:1] == ['developers']:
+            return DEVELOPERS_PAGE
+        language = parts[0].lower() if parts else ''
+        candidates = []
+        if language:
+            if since:
+                candidates.append('_{0}_{1}'.format(language, since))
+            candidates.append('_' + language)
+        candidates.append('')
+        for suffix in candidates:
+            file_name = REPOSITORIES_PAGE.format(suffix)
+            if os.path.isfile(os.path.join(FIXTURES_DIR, file_name)):
+                return file_name
+        return None
+
+    def find_readme(self, parts):
+        """Pick a sample README for a raw url, the same one for a repository."""
+        if len(parts) != 4 or parts[2] != README_BRANCH or parts[3].lower() != README_NAME:
+            return None
+        repository = '/'.join(parts[:2]).encode('utf-8')
+        return READMES[zlib.crc32(repository) % len(READMES)]
+
+    def find_fixture(self, path):
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        if parts[:1] == ['trending']:
+            since = parse_qs(url.query).get('since', [''])[0]
+            return self.find_trending_page(parts[1:], since)
+        return self.find_readme(parts)
+
+
+class FakeGithubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        number = server.count('requests')
+        if server.latency:
+            time.sleep(server.latency)
+        if server.throttle_every and number % server.throttle_every == 0:
+            server.count('throttled')
+            self.send_empty(429, [('Retry-After', str(server.retry_after))])
+            return
+        file_name = server.find_fixture(self.path)
+        fixture = server.read_fixture(file_name) if file_name else None
+        if fixture is None:
+            server.count('not_found')
+            self.send_empty(404)
+            return
+        body, etag = fixture
+        if self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            self.send_empty(304, [('ETag', etag)])
+            return
+        if file_name.endswith('.html'):
+            content_type = 'text/html; charset=utf-8'
+        else:
+            content_type = 'text/plain; charset=utf-8'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.send_body(body)
+
+    def send_empty(self, status, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_body(self, body):
+        server = self.server
+        if not server.drip_rate:
+            self.wfile.write(body)
+            return
+        delay = server.drip_chunk / server.drip_rate
+        for start in range(0, len(body), server.drip_chunk):
+            self.wfile.write(body[start:start + server.drip_chunk])
+            self.wfile.flush()
+            time.sleep(delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Serve the recorded fixtures in place of github.com.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='seconds every response is delayed by')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='answer every Nth request with 429')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with a 429')
+    parser.add_argument('--drip-rate', type=int, default=0,
+                        help='bytes per second bodies are sent at')
+    parser.add_argument('--drip-chunk', type=int, default=1024,
+                        help='bytes written at a time when dripping')
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    server = FakeGithubServer((args.host, args.port),
+                              latency=args.latency,
+                              throttle_every=args.throttle_every,
+                              retry_after=args.retry_after,
+                              drip_rate=args.drip_rate,
+                              drip_chunk=args.drip_chunk)
+    print('Serving {0} on http://{1}:{2}/'.format(FIXTURES_DIR, args.host, args.port))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(', '.join('{0} {1}'.format(key, value)
+                        for key, value in sorted(server.stats.items())))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Check that `gt trend --help` stays within its import time budget.
+
+Exits with status 1 if the imports take longer than the budget or if a
+heavy dependency, only needed to fetch, parse or render pages, is imported.
+
+Usage:
+
+    $ python benchmarks/import_time.py [budget in ms]
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 150
+RUNS = 5
+LAZY_MODULES = [
+    'bs4',
+    'concurrent.futures',
+    'lxml',
+    'markdown',
+    'prompt_toolkit',
+    'pygments',
+    'requests',
+    'sqlite3',
+]
+CODE = '''
+import sys
+sys.argv = ['gt', 'trend', '--help']
+from github_trending.main_cli import cli
+try:
+    cli()
+except SystemExit:
+    pass
+sys.stderr.write('modules: ' + ' '.join(sorted(sys.modules)) + '\\n')
+'''
+IMPORT_TIME = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)\S+$')
+
+
+def run_gt_help():
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', CODE],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               env=env, cwd=ROOT_DIR)
+    _, err = process.communicate()
+    total_us = 0
+    modules = []
+    for line in err.decode('utf-8', 'replace').splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            # Top level imports have no indentation, their cumulative time
+            # includes everything they imported.
+            if not match.group(2):
+                total_us += int(match.group(1))
+        elif line.startswith('modules: '):
+            modules = line[len('modules: '):].split()
+    return total_us / 1000, modules
+
+
+def main(budget_ms):
+    if sys.version_info < (3, 7):
+        print('python -X importtime needs Python 3.7+')
+        sys.exit(2)
+    runs = [run_gt_help() for _ in range(RUNS)]
+    import_ms = min(run[0] for run in runs)
+    loaded = [module for module in LAZY_MODULES if module in runs[0][1]]
+    print('gt trend --help imports: {0:.1f} ms (budget {1} ms)'.format(import_ms, budget_ms))
+    if loaded:
+        print('imported eagerly: ' + ', '.join(loaded))
+    if import_ms > budget_ms or loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Compare the trending page parsers on the recorded fixtures.
+
+Usage:
+
+    $ python benchmarks/parsers.py [iterations]
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_trending.lib.github.github import GithubTrendingApi, PARSERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGES = [
+    ('trending_repositories.html', False),
+    ('trending_developers.html', True),
+]
+LIMIT = 25
+
+
+def main(iterations):
+    for file_name, dev in PAGES:
+        with io.open(os.path.join(FIXTURES_DIR, file_name), encoding='utf-8') as page:
+            text = page.read()
+        results = {}
+        for parser in PARSERS:
+            api = GithubTrendingApi(parser=parser)
+            results[parser] = api.parse_page(text, dev, LIMIT)
+            seconds = min(timeit.repeat(lambda: api.parse_page(text, dev, LIMIT),
+                                        repeat=3, number=iterations))
+            print('{0:<30} {1:<5} {2:8.3f} ms/page'.format(
+                file_name, parser, seconds / iterations * 1000))
+        if len(set(repr(result) for result in results.values())) != 1:
+            print('{0:<30} parsers disagree'.format(file_name))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
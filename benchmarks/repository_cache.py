@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Compare loading the repository cache with the config section it replaced.
+
+Usage:
+
+    $ python benchmarks/repository_cache.py [entries]
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import ast
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_trending.compat import configparser
+from github_trending.repository_cache import RepositoryCache
+
+DESCRIPTION = u'A fast, small and portable library 一个简单易用的框架 #{0}'
+
+
+def create_repositories(entries):
+    return dict(('user{0}/repository-{0}'.format(index), DESCRIPTION.format(index))
+                for index in range(entries))
+
+
+def load_config_section(path):
+    parser = configparser.RawConfigParser()
+    parser.read(path)
+    return ast.literal_eval(parser.get('github-trending', 'repositories').strip())
+
+
+def main(entries):
+    repositories = create_repositories(entries)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        config_path = os.path.join(temp_dir, 'config')
+        parser = configparser.RawConfigParser()
+        parser.add_section('github-trending')
+        parser.set('github-trending', 'repositories', repr(repositories))
+        with open(config_path, 'w') as config_file:
+            parser.write(config_file)
+
+        cache = RepositoryCache(os.path.join(temp_dir, RepositoryCache.CACHE_FILE))
+        cache.update(repositories)
+        cache.compact()
+
+        if load_config_section(config_path) != dict(cache.load()):
+            print('repository caches disagree')
+            sys.exit(1)
+        for name, load in (('config section', lambda: load_config_section(config_path)),
+                           ('repository log', lambda: RepositoryCache(cache.path).load())):
+            seconds = min(timeit.repeat(load, repeat=5, number=1))
+            print('{0:<16} {1:6} entries {2:8.2f} ms'.format(name, entries, seconds * 1000))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
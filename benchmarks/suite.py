@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Time every phase of gt on the recorded fixtures and report JSON.
+
+The recorded trending pages are replayed through `get_metadata` and the
+formatters, and the sample READMEs through the markdown viewer. Each phase
+reports its best time, throughput and, on Python 3, the memory it allocated.
+The startup of both entry points is timed in fresh interpreters.
+
+Usage:
+
+    $ python benchmarks/suite.py [output.json]
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import requests
+
+from github_trending import __version__
+from github_trending.github_trending import GithubTrending
+from github_trending.lib.github.github import GithubTrendingApi
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 has no tracemalloc, allocations are not reported.
+    tracemalloc = None
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGES = [
+    # (fixture, language, dev, weekly, monthly)
+    ('trending_repositories.html', None, False, False, False),
+    ('trending_repositories_python.html', 'python', False, False, False),
+    ('trending_repositories_go_weekly.html', 'go', False, True, False),
+    ('trending_repositories_rust_monthly.html', 'rust', False, False, True),
+    ('trending_developers.html', None, True, False, False),
+]
+READMES = [
+    'readme_english.md',
+    'readme_cjk.md',
+]
+ENTRY_POINTS = [
+    # gt runs a command, github-trending gets as far as building its shell.
+    ('gt', 'from github_trending.github_trending_cli import GithubTrendingCli; '
+           'GithubTrendingCli.cli(["trend", "--help"])'),
+    ('github-trending', 'from github_trending.github import Github'),
+]
+LIMIT = 25
+REPEAT = 5
+NUMBER = 20
+STARTUP_RUNS = 5
+
+
+def read_fixture(file_name):
+    with io.open(os.path.join(FIXTURES_DIR, file_name), 'rb') as fixture:
+        return fixture.read()
+
+
+class ReplaySession(object):
+    """Serve the recorded pages in place of the HTTP session."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.stats = {'requests': 0, 'throttled': 0, 'retried': 0, 'failed': 0}
+
+    def get(self, url, **kwargs):
+        response = requests.models.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = 'utf-8'
+        response.raw = io.BytesIO(self.pages[url])
+        return response
+
+
+def measure(func, number=NUMBER):
+    """Time func and trace the memory of one call.
+
+    :return: The best seconds per call, and the bytes still allocated after
+        the call and at its peak.
+    """
+    seconds = min(timeit.repeat(func, repeat=REPEAT, number=number)) / number
+    result = {'seconds': seconds}
+    if tracemalloc is not None:
+        tracemalloc.start()
+        func()
+        allocated, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['retained_bytes'] = allocated
+        result['peak_bytes'] = peak
+    return result
+
+
+def benchmark_parse(api, pages):
+    results = {}
+    items = {}
+    for file_name, language, dev, weekly, monthly in PAGES:
+        def parse():
+            return api.get_metadata(language, dev, weekly, monthly, LIMIT)
+        items[file_name] = parse()
+        result = measure(parse)
+        result['items'] = len(items[file_name])
+        result['items_per_second'] = result['items'] / result['seconds']
+        result['bytes_per_second'] = len(pages[file_name]) / result['seconds']
+        results[file_name] = result
+    return results, items
+
+
+def benchmark_format(github_trending, items):
+    results = {}
+    for file_name, _, dev, _, _ in PAGES:
+        format_item = github_trending.format_developer if dev else github_trending.format_repository
+
+        def format_page():
+            return [format_item(index, item)
+                    for index, item in enumerate(items[file_name], start=1)]
+        result = measure(format_page)
+        result['items'] = len(items[file_name])
+        result['items_per_second'] = result['items'] / result['seconds']
+        results[file_name] = result
+    return results
+
+
+def import_mdv():
+    # The viewer prints a warning to stdout when it is not run in a
+    # terminal, keep it out of the report.
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        from github_trending.lib.mdv import markdownviewer as mdv
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return mdv
+
+
+def benchmark_readme():
+    mdv = import_mdv()
+    results = {}
+    for file_name in READMES:
+        text = read_fixture(file_name).decode('utf-8')
+        try:
+            result = measure(lambda: mdv.main(md=text, L=True, l=True), number=1)
+        except Exception as e:
+            results[file_name] = {'error': '{0}: {1}'.format(type(e).__name__, e)}
+            continue
+        result['bytes_per_second'] = len(text.encode('utf-8')) / result['seconds']
+        results[file_name] = result
+    return results
+
+
+def benchmark_startup():
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    results = {}
+    with open(os.devnull, 'w') as devnull:
+        for name, code in ENTRY_POINTS:
+            timer = timeit.default_timer
+            runs = []
+            for _ in range(STARTUP_RUNS):
+                start = timer()
+                subprocess.call([sys.executable, '-c', code], env=env,
+                                stdout=devnull, stderr=devnull)
+                runs.append(timer() - start)
+            results[name] = {'seconds': min(runs)}
+    return results
+
+
+def main(output_path):
+    pages = dict((file_name, read_fixture(file_name)) for file_name, _, _, _, _ in PAGES)
+    api = GithubTrendingApi(session=ReplaySession({}))
+    api.session.pages = dict((api.build_url(language, dev, monthly, weekly), pages[file_name])
+                             for file_name, language, dev, weekly, monthly in PAGES)
+    github_trending = GithubTrending()
+
+    parse_results, items = benchmark_parse(api, pages)
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'limit': LIMIT,
+        'phases': {
+            'parse': parse_results,
+            'format': benchmark_format(github_trending, items),
+            'readme': benchmark_readme(),
+            'startup': benchmark_startup(),
+        },
+    }
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if output_path:
+        with open(output_path, 'w') as output:
+            output.write(data + '\n')
+    else:
+        print(data)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Compare the width table with asking `unicodedata` for every character.
+
+The descriptions of the recorded trending pages, mostly ASCII, and the
+paragraphs of the CJK sample README are measured both ways, and the table is
+checked against `unicodedata` for every code point when both
+are of the same Unicode version.
+
+Usage:
+
+    $ python benchmarks/text_width.py
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import os
+import sys
+import timeit
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_trending.lib.github.github import GithubTrendingApi
+from github_trending.text_width import UNICODE_VERSION, char_width, text_width
+
+try:
+    to_char = unichr
+except NameError:
+    to_char = chr
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGES = [
+    ('trending_repositories.html', False),
+    ('trending_repositories_python.html', False),
+    ('trending_repositories_go_weekly.html', False),
+    ('trending_repositories_rust_monthly.html', False),
+    ('trending_developers.html', True),
+]
+LIMIT = 100
+CJK_README = 'readme_cjk.md'
+
+
+def unicodedata_width(text):
+    count = 0
+    for c in text:
+        if unicodedata.east_asian_width(c) in 'FWA':
+            count += 2
+        else:
+            count += 1
+    return count
+
+
+def read_descriptions():
+    api = GithubTrendingApi(session=object())
+    descriptions = []
+    for file_name, dev in PAGES:
+        with io.open(os.path.join(FIXTURES_DIR, file_name), 'rb') as fixture:
+            items = api.parse_page(fixture.read(), dev, LIMIT)
+        descriptions.extend(item.description for item in items)
+    return descriptions
+
+
+def read_cjk_paragraphs():
+    with io.open(os.path.join(FIXTURES_DIR, CJK_README), encoding='utf-8') as fixture:
+        text = fixture.read()
+    return [paragraph.replace(u'\n', u' ') for paragraph in text.split(u'\n\n')
+            if paragraph.strip()]
+
+
+def main():
+    if unicodedata.unidata_version == UNICODE_VERSION:
+        for code in range(sys.maxunicode + 1):
+            c = to_char(code)
+            if char_width(c) != unicodedata_width(c):
+                print('width of U+{0:04X} disagrees'.format(code))
+                sys.exit(1)
+    else:
+        print('skipped checking every code point, the table is Unicode {0} and '
+              'unicodedata {1}'.format(UNICODE_VERSION, unicodedata.unidata_version))
+    cases = [
+        ('descriptions', read_descriptions()),
+        ('CJK paragraphs', read_cjk_paragraphs()),
+    ]
+    for case, texts in cases:
+        if [text_width(text) for text in texts] != [unicodedata_width(text) for text in texts]:
+            print('{0} widths disagree'.format(case))
+            sys.exit(1)
+        for name, width in (('unicodedata', unicodedata_width), ('width table', text_width)):
+            seconds = min(timeit.repeat(lambda: [width(text) for text in texts],
+                                        repeat=5, number=20)) / 20
+            print('{0:<12} {1:4} {2:<15} {3:8.3f} ms'.format(name, len(texts), case, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
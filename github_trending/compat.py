@@ -14,11 +14,35 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 
-import urllib
 try:
     # Python 3
     import configparser
-    from urllib.request import urlretrieve
 except ImportError:
     import ConfigParser as configparser
-    from urllib import urlretrieve
+try:
+    # Python 2
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    # Python 3.3+
+    from os import replace as replace_file
+except ImportError:
+    from os import rename as replace_file
+try:
+    # Python 3.3+
+    from shutil import get_terminal_size
+except ImportError:
+    def get_terminal_size(fallback=(80, 24)):
+        """Get the terminal width from $COLUMNS or the terminal, like Python 3."""
+        import os
+        import sys
+        import click
+        try:
+            columns = int(os.environ['COLUMNS'])
+        except (KeyError, ValueError):
+            if sys.stdout.isatty():
+                columns = click.get_terminal_size()[0]
+            else:
+                columns = fallback[0]
+        return columns, fallback[1]
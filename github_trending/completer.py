@@ -18,7 +18,7 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 from prompt_toolkit.completion import Completer
-from .config import Config
+from .repository_cache import RepositoryCache
 
 from .completions import SUBCOMMANDS, ARGS_OPTS_LOOKUP
 
@@ -36,16 +36,26 @@ class Completer(Completer):
     def __init__(self, fuzzy_match, text_utils):
         self.fuzzy_match = fuzzy_match
         self.text_utils = text_utils
-        self.config = Config()
+        self.repository_cache = RepositoryCache()
+        self.view_args = set()
 
     def update_view_args(self):
-        """Update view subcommand args from ~/.githubtrendingconfig"""
-        ARGS_OPTS_LOOKUP['view']['args'] = []
-        self.config.repositories = {}
-        self.config.load_config([self.config.load_config_repositories])
-        for user_repository in self.config.repositories.keys():
-            ARGS_OPTS_LOOKUP['view']['args'].append(user_repository)
-        self.text_utils.update_meta_lookup(self.config.repositories)
+        """Update view subcommand args from the repository cache
+
+        Only the entries added since the last update are applied, the args
+        are rebuilt when the cache was rewritten or evicted entries.
+        """
+        changes = self.repository_cache.refresh()
+        if changes is None:
+            ARGS_OPTS_LOOKUP['view']['args'] = list(self.repository_cache.repositories.keys())
+            self.view_args = set(ARGS_OPTS_LOOKUP['view']['args'])
+            self.text_utils.update_meta_lookup(self.repository_cache.repositories)
+            return
+        for user_repository in changes:
+            if user_repository not in self.view_args:
+                ARGS_OPTS_LOOKUP['view']['args'].append(user_repository)
+                self.view_args.add(user_repository)
+        self.text_utils.update_meta_lookup(changes)
 
     def completing_command(self, words, word_before_cursor):
         """Determine if we are currently completing the gh command.
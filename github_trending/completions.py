@@ -17,6 +17,7 @@
 SUBCOMMANDS = {
     'trend': 'Trend repositories',
     'view': 'View repository README',
+    'diff': 'Diff trending since a snapshot',
 }
 ARGS_OPTS_LOOKUP = {
     'trend': {
@@ -24,6 +25,8 @@ ARGS_OPTS_LOOKUP = {
         'opts': [
             '--language python',
             '-la python',
+            '--languages python,go',
+            '--concurrency 4',
             '--dev',
             '-d',
             '--weekly',
@@ -34,6 +37,24 @@ ARGS_OPTS_LOOKUP = {
             '-b',
             '--limit 10',
             '-li 10',
+            '--format json',
+            '-f json',
+        ],
+    },
+    'diff': {
+        'args': [],
+        'opts': [
+            '--language python',
+            '-la python',
+            '--dev',
+            '-d',
+            '--weekly',
+            '-w',
+            '--monthly',
+            '-m',
+            '--hours 24',
+            '--limit 10',
+            '-li 10',
         ],
     },
     'view': {
@@ -48,6 +69,8 @@ META_LOOKUP = {
     'user/repository': 'View README of repository(ex:blue-9/github-trending) (string)',
     '--language python': 'View specific language trending (string)',
     '-la': 'View specific language trending (string)',
+    '--languages python,go': 'View several languages trending, comma separated or "all" (string)',
+    '--concurrency 4': 'Limits the number of pages fetched at once (int)',
     '--dev': 'View developers trending (string)',
     '-d': 'View developers trending (flag)',
     '--weekly': 'View 1 week trending (flag)',
@@ -56,7 +79,10 @@ META_LOOKUP = {
     '-m': 'View 1 month trending (flag)',
     '--browser': 'View in a browser instead of the terminal (flag)',
     '-b': 'View in a browser instead of the terminal (flag)',
+    '--hours 24': 'Compare with the latest snapshot at least this old (int)',
     '--limit 10': 'Limits the number of items displayed (int)',
+    '--format json': 'Write the items as json, ndjson, csv or tsv instead (string)',
+    '-f': 'Write the items as json, ndjson, csv or tsv instead (string)',
     '-li 10': 'Limits the number of items displayed (int)',
 }
 META_LOOKUP.update(SUBCOMMANDS)
@@ -22,7 +22,10 @@ import ast
 
 import click
 from .compat import configparser
-from .compat import urlretrieve
+from .compat import StringIO
+from .http_cache import HttpCache
+from .lib.github.github import PARSERS
+from .storage import file_lock, write_file_atomic
 
 class Config(object):
     """Github Trending config."""
@@ -45,15 +48,19 @@ class Config(object):
     CONFIG_SECTION = 'github-trending'
     CONFIG_REPOSITORIES = 'repositories'
     CONFIG_SHOW_TIP = 'show_tip'
-    MAX_ITEM_CACHE_SIZE = 20000
+    CONFIG_CACHE_TTL = 'cache_ttl'
+    CONFIG_PARSER = 'parser'
 
     def __init__(self):
         self.repositories = {}
         self.show_tip = True
+        self.cache_ttl = HttpCache.TTL
+        self.parser = PARSERS[0]
         self._init_colors()
         self.load_config([
-            self.load_config_repositories,
             self.load_config_colors,
+            self.load_config_cache_ttl,
+            self.load_config_parser,
             self.load_config_show_tip,
         ])
 
@@ -74,11 +81,6 @@ class Config(object):
         self.clr_organization = 'green'
         self.clr_dev_repository = 'yellow'
 
-    def clear_repositories(self):
-        """Clear the repository cache."""
-        self.repositories = {}
-        self.save_cache()
-
     def get_config_path(self, config_file_name):
         """Get the config file path.
 
@@ -121,13 +123,19 @@ class Config(object):
         self.load_colors(parser)
 
     def load_config_repositories(self, parser):
-        """Load the repository cache from ~/.githubtrendingconfig.
+        """Load the repository cache older versions kept in ~/.githubtrendingconfig.
+
+        The cache now lives in :class:`repository_cache.RepositoryCache`,
+        this is only used to migrate it.
 
         :type parser: :class:`ConfigParser.RawConfigParser`
         :param parser: An instance of `ConfigParser.RawConfigParser`.
         """
-        self.repositories = self.load_section_list(parser,
-                                                   self.CONFIG_REPOSITORIES)
+        try:
+            self.repositories = self.load_section_list(parser,
+                                                       self.CONFIG_REPOSITORIES)
+        except (configparser.Error, ValueError, SyntaxError):
+            self.repositories = {}
 
     def load_config_show_tip(self, parser):
         """Load the show tip config from ~/.githubtrendingconfig.
@@ -138,6 +146,36 @@ class Config(object):
         self.show_tip = parser.getboolean(self.CONFIG_SECTION,
                                           self.CONFIG_SHOW_TIP)
 
+    def load_config_cache_ttl(self, parser):
+        """Load the http cache ttl config from ~/.githubtrendingconfig.
+
+        :type parser: :class:`ConfigParser.RawConfigParser`
+        :param parser: An instance of `ConfigParser.RawConfigParser`.
+        """
+        try:
+            self.cache_ttl = parser.getint(self.CONFIG_SECTION,
+                                           self.CONFIG_CACHE_TTL)
+        except (configparser.NoOptionError, ValueError):
+            # Configs written by older versions have no cache ttl.
+            pass
+
+    def load_config_parser(self, parser):
+        """Load the trending page parser config from ~/.githubtrendingconfig.
+
+        lxml is the default, bs4 is slower but can be switched to if GitHub
+        changes its markup in a way the lxml parser cannot read.
+
+        :type parser: :class:`ConfigParser.RawConfigParser`
+        :param parser: An instance of `ConfigParser.RawConfigParser`.
+        """
+        try:
+            value = parser.get(self.CONFIG_SECTION, self.CONFIG_PARSER)
+        except configparser.NoOptionError:
+            # Configs written by older versions have no parser.
+            return
+        if value in PARSERS:
+            self.parser = value
+
     def load_color(self, parser, color_config, default):
         """Load the specified color form ~/.githubtrendingconfig.
 
@@ -195,7 +233,7 @@ class Config(object):
             parser=parser,
             color_config=self.CONFIG_CLR_DESCRIPTION,
             default=self.clr_description)
-        self.clr_programming = self.load_color(
+        self.clr_programming_language = self.load_color(
             parser=parser,
             color_config=self.CONFIG_CLR_PROGRAMMING_LANGUAGE,
             default=self.clr_programming_language)
@@ -241,14 +279,37 @@ class Config(object):
         repositories = repositories.strip()
         return ast.literal_eval(repositories)
 
+    def create_config(self):
+        """Save ~/.githubtrendingconfig with the defaults if there is none yet."""
+        if not os.path.exists(self.get_config_path(self.CONFIG)):
+            self.save_cache()
+
     def save_cache(self):
-        """Save the current set of repositorys and cache to ~/.githubtrending."""
-        if self.repositories is not None and \
-                len(self.repositories) > self.MAX_ITEM_CACHE_SIZE:
-            self.repositories= self.repositories[-self.MAX_ITEM_CACHE_SIZE//2:]
+        """Save the colors and preferences to ~/.githubtrendingconfig.
+
+        The config is locked, read again so options set by others are kept,
+        and replaced atomically.
+        """
         config_file_path = self.get_config_path(self.CONFIG)
-        parser = configparser.RawConfigParser()
-        parser.add_section(self.CONFIG_SECTION)
+        # The lock lives in the cache dir, not next to the user's dotfile.
+        with file_lock(config_file_path, lock_dir=HttpCache.get_cache_dir()):
+            parser = configparser.RawConfigParser()
+            parser.read(config_file_path)
+            self.set_config(parser)
+            config_file = StringIO()
+            parser.write(config_file)
+            write_file_atomic(config_file_path, config_file.getvalue())
+
+    def set_config(self, parser):
+        """Set the colors and preferences on the given parser.
+
+        :type parser: :class:`ConfigParser.RawConfigParser`
+        :param parser: An instance of `ConfigParser.RawConfigParser`.
+        """
+        if not parser.has_section(self.CONFIG_SECTION):
+            parser.add_section(self.CONFIG_SECTION)
+        # The repository cache moved to its own file.
+        parser.remove_option(self.CONFIG_SECTION, self.CONFIG_REPOSITORIES)
         parser.set(self.CONFIG_SECTION,
                    self.CONFIG_CLR_GENERAL,
                    self.clr_general)
@@ -295,7 +356,8 @@ class Config(object):
                    self.CONFIG_SHOW_TIP,
                    self.show_tip)
         parser.set(self.CONFIG_SECTION,
-                   self.CONFIG_REPOSITORIES,
-                   self.repositories)
-        with open(config_file_path, 'w+') as config_file:
-            parser.write(config_file)
+                   self.CONFIG_CACHE_TTL,
+                   self.cache_ttl)
+        parser.set(self.CONFIG_SECTION,
+                   self.CONFIG_PARSER,
+                   self.parser)
@@ -17,7 +17,7 @@
 from __future__ import print_function
 
 import os
-import platform
+import shlex
 import subprocess
 import sys
 
@@ -32,8 +32,10 @@ from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 
 from .__init__ import __version__
 from .completer import Completer
+from .github_trending import GithubTrending
 from .github_trending_cli import GithubTrendingCli
 from .keys import KeyManager
+from .pager import Pager
 from .style import StyleFactory
 from .toolbar import Toolbar
 from .utils import TextUtils
@@ -49,7 +51,7 @@ class Github(object):
     :param CMDS_ENABLE_PAGINATE: A list of commands that kick off pagination.
 
     :type CMDS_NO_PAGINATE: list (const)
-    :param CMDS_NO_PAGINATE: A list of commands that disable pagination.
+    :param CMDS_NO_PAGINATE: A list of options that disable pagination.
 
     :type completer: :class:`prompt_toolkit.completer`
     :param completer: An instance of `prompt_toolkit.completer`.
@@ -62,8 +64,15 @@ class Github(object):
     :param key_manager: An instance of `prompt_toolkit.key_binding.manager.
         KeyBindingManager`.
 
-    :type PAGINATE_CMD: str (const)
-    :param PAGINATE_CMD: The command to enable pagination.
+    :type pager: :class:`pager.Pager`
+    :param pager: An instance of `pager.Pager`.
+
+    :type GT_CMDS: list (const)
+    :param GT_CMDS: The commands run in-process by the `GithubTrendingCli`.
+
+    :type SHELL_CHARS: str (const)
+    :param SHELL_CHARS: The characters that need the shell, like pipes and
+        redirects.
 
     :type text_utils: :class:`util.TextUtils`
     :param text_utils: An instance of `util.TextUtils`.
@@ -75,37 +84,27 @@ class Github(object):
     CMDS_NO_PAGINATE = [
         '-b',
         '--browser',
-        '>',
-        '<',
+        '--help',
     ]
     CMDS_ENABLE_PAGINATE = [
-        '-cq',
-        '--comments_regex_query',
-        '-c',
-        '--comments',
-        '-cr',
-        '--comments_recent',
-        '-cu',
-        '--comments_unseen',
-        '-ch',
-        '--comments_hide_non_matching',
-        'hiring',
-        'freelance',
+        'trend',
+        'view',
+        'diff',
     ]
-    PAGINATE_CMD = ' | less -r'
-    PAGINATE_CMD_WIN = ' | more'
+    GT_CMDS = ['gt']
+    SHELL_CHARS = '|&;<>()$`'
 
     def __init__(self):
         self.cli = None
         self.key_manager = None
         self.theme = 'vim'
         self.github_trending_cli = GithubTrendingCli()
+        self.github_trending = None
+        self.pager = Pager()
         self.text_utils = TextUtils()
         self.completer = Completer(fuzzy_match=False,
                                    text_utils=self.text_utils)
         self._create_cli()
-        if platform.system() == 'Windows':
-            self.CMDS_ENABLE_PAGINATE.append('view')
 
     def _create_key_manager(self):
         """Create the :class:`KeyManager`.
@@ -152,25 +151,21 @@ class Github(object):
             application=application,
             eventloop=eventloop)
 
-    def _add_comment_pagination(self, document_text):
-        """Add the command to enable comment pagination where applicable.
+    def should_paginate(self, args):
+        """Determine if the output of a `gt` command should be paginated.
 
-        Pagination is enabled if the command views comments and the
-        browser flag is not enabled.
+        Pagination is enabled for the commands listing trendings or READMEs
+        unless they open a browser or show help.
 
-        :type document_text: str
-        :param document_text: The input command.
+        :type args: list
+        :param args: The command args after `gt`.
 
-        :rtype: str
-        :return: the input command with pagination enabled.
+        :rtype: bool
+        :return: Specifies whether to paginate the output.
         """
-        if not any(sub in document_text for sub in self.CMDS_NO_PAGINATE):
-            if any(sub in document_text for sub in self.CMDS_ENABLE_PAGINATE):
-                if platform.system() == 'Windows':
-                    document_text += self.PAGINATE_CMD_WIN
-                else:
-                    document_text += self.PAGINATE_CMD
-        return document_text
+        if not args or args[0] not in self.CMDS_ENABLE_PAGINATE:
+            return False
+        return not any(arg in self.CMDS_NO_PAGINATE for arg in args)
 
     def handle_exit(self, document):
         """Exits if the user typed exit or quit
@@ -181,14 +176,82 @@ class Github(object):
         if document.text in ('exit', 'quit'):
             sys.exit()
 
+    def parse_gt_command(self, document_text):
+        """Split a `gt` command that can run without a shell.
+
+        :type document_text: str
+        :param document_text: The input command.
+
+        :rtype: list
+        :return: The command args after `gt`, or None if the command has to
+            run in a shell.
+        """
+        if any(char in document_text for char in self.SHELL_CHARS):
+            return None
+        try:
+            words = shlex.split(document_text)
+        except ValueError:
+            return None
+        if not words or words[0] not in self.GT_CMDS:
+            return None
+        return words[1:]
+
+    def dispatch(self, args, **extra):
+        """Invoke the `GithubTrendingCli` group with the warm `GithubTrending`.
+
+        :type args: list
+        :param args: The command args after `gt`.
+
+        :type extra: dict
+        :param extra: Extra :class:`click.Context` settings.
+        """
+        self.github_trending_cli.cli.main(args=args,
+                                          prog_name='gt',
+                                          obj=self.github_trending,
+                                          standalone_mode=False,
+                                          **extra)
+
+    def run_gt_command(self, args):
+        """Run a `gt` command in-process.
+
+        The `GithubTrending` instance, with its HTTP session and caches, is
+        kept warm across commands.
+
+        :type args: list
+        :param args: The command args after `gt`.
+        """
+        if self.github_trending is None:
+            self.github_trending = GithubTrending()
+        try:
+            if self.should_paginate(args):
+                with self.pager.page():
+                    # Keep the colors, the pager is not a terminal.
+                    self.dispatch(args, color=True)
+            else:
+                self.dispatch(args)
+        except click.ClickException as e:
+            e.show()
+        except click.Abort:
+            click.echo('Aborted!', err=True)
+        except SystemExit:
+            # --help and failed commands exit, the shell keeps running.
+            pass
+
     def run_command(self, document):
         """Run the given command.
 
+        `gt` commands run in-process, anything else or a command with pipes
+        or redirects runs in a shell.
+
         :type document: :class:`prompt_toolkit.document.Document`
         :param document: An instance of `prompt_toolkit.document.Document`.
         """
         try:
-            subprocess.call(document.text, shell=True)
+            args = self.parse_gt_command(document.text)
+            if args is not None:
+                self.run_gt_command(args)
+            else:
+                subprocess.call(document.text, shell=True)
         except Exception as e:
             click.secho(e, fg='red')
 
@@ -20,17 +20,24 @@ from __future__ import division
 import platform
 import re
 import sys
+import time
 import webbrowser
-import unicodedata
-import requests
 
 import click
 #from .compat import HTMLParser
 #from .compat import urlparse
 
+from .compat import get_terminal_size
 from .config import Config
-from .lib.github.github import GithubTrendingApi
-from .lib.mdv import markdownviewer as mdv
+from .http_cache import HttpCache
+from .lib.github.github import GithubTrendingApi, PageReadError, TrendingQuery, get_base_url
+from .lib.github.records import TrendingDeveloper, TrendingRepository, format_count
+from .record_writer import PAGE_FIELDS, TEXT_FORMAT, iter_rows, write_records
+from .repository_cache import RepositoryCache
+from .snapshot_diff import diff_snapshots
+from .snapshot_store import SnapshotStore, get_period
+from .terminal_style import Style, use_color
+from .text_width import char_width, text_width, wrap_text
 #from .lib.pretty_date_time import pretty_date_time
 #from .onions import onions
 #from .web_viewer import WebViewer
@@ -41,12 +48,60 @@ class GithubTrending(object):
     """Encapsulate Github Trending."""
 
     MAX_COLUMN = 100
+    MAX_DESCRIPTION_COLUMN = 78
+    OUTPUT_CHUNK_SIZE = 0
 
     def __init__(self):
-        self.github_trending_api = GithubTrendingApi()
         self.config = Config()
+        self.columns = self.get_columns()
+        self.style = Style()
+        self._session = None
+        self._github_trending_api = None
+        self._readme_locator = None
+        self.repository_cache = RepositoryCache()
         # self.web_viewer = WebViewer()
 
+    # The HTTP session and what uses it are created on first use, so commands
+    # like `gt trend --help` do not import requests.
+    @property
+    def session(self):
+        """Get the HTTP session shared by every request.
+
+        :rtype: :class:`session.HttpSession`
+        :return: An instance of `session.HttpSession`.
+        """
+        if self._session is None:
+            from .session import HttpSession
+            self._session = HttpSession()
+        return self._session
+
+    @property
+    def github_trending_api(self):
+        """Get the Github Trending API.
+
+        :rtype: :class:`lib.github.github.GithubTrendingApi`
+        :return: An instance of `lib.github.github.GithubTrendingApi`.
+        """
+        if self._github_trending_api is None:
+            self._github_trending_api = GithubTrendingApi(
+                session=self.session,
+                cache=HttpCache(ttl=self.config.cache_ttl),
+                parser=self.config.parser,
+                store=SnapshotStore())
+        return self._github_trending_api
+
+    @property
+    def readme_locator(self):
+        """Get the README locator.
+
+        :rtype: :class:`readme.ReadmeLocator`
+        :return: An instance of `readme.ReadmeLocator`.
+        """
+        if self._readme_locator is None:
+            from .readme import ReadmeLocator
+            self._readme_locator = ReadmeLocator(self.session)
+        return self._readme_locator
+
     def headlines_message(self, message):
         """Create the "Fetching [message] Headlines..." string.
 
@@ -66,64 +121,34 @@ class GithubTrending(object):
         """
         click.secho('Item with id {0} not found.'.format(item_id), fg=self.config.clr_error)
 
-    def get_east_asian_width_count(self, text):
-        count = 0
-        for c in text:
-            if unicodedata.east_asian_width(c) in 'FWA':
-                count += 2
-            else:
-                count += 1
-        return count
+    def get_columns(self):
+        """Get the width of the listings, the terminal's up to MAX_COLUMN.
+
+        The terminal width can be set with $COLUMNS, output that is not
+        written to a terminal is MAX_COLUMN wide.
+
+        :rtype: int
+        :return: The number of columns.
+        """
+        columns = get_terminal_size((self.MAX_COLUMN, 24))[0]
+        return min(columns, self.MAX_COLUMN)
 
     def format_repository(self, index, repository):
 
-        def _get_blank_num(repository):
+        def _get_blank_num(programming_language, total_stars, forks, stars_trending):
             """ Gets the blank num of between fork to today stars.
             """
-            blank_num = self.MAX_COLUMN
+            blank_num = self.columns
             blank_num -= 6 # header blanks
-            if repository['Programming Language']:
-                blank_num -= len(repository['Programming Language']) + 4 # a 2 byte unicode and 2 blanks
-            if repository['Total stars']:
-                blank_num -= len(repository['Total stars']) + 4 # a 2 byte unicode and 2 blanks
-            if repository['Forks']:
-                blank_num -= len(repository['Forks']) + 3 # a 2 byte unicode and a blank
-            blank_num -= len(repository['Stars trending']) + 3 # a 2 byte unicode and 2 blanks
+            if programming_language:
+                blank_num -= len(programming_language) + 4 # a 2 byte unicode and 2 blanks
+            if total_stars:
+                blank_num -= len(total_stars) + 4 # a 2 byte unicode and 2 blanks
+            if forks:
+                blank_num -= len(forks) + 3 # a 2 byte unicode and a blank
+            blank_num -= len(stars_trending) + 3 # a 2 byte unicode and 2 blanks
             return blank_num
 
-        def _is_description_english(s):
-            for c in s:
-                if unicodedata.east_asian_width(c) in 'FWA':
-                    return False
-            return True
-
-        def _is_word_one_language(text):
-            text_len = self.get_east_asian_width_count(text)
-            if text_len == len(text) or text_len == len(text) * 2:
-                return True
-            else:
-                return False
-
-        def _format_description(description):
-            formatted_description = ''
-            max_column = 78 # for description
-            column_len = 6 # header blanks
-
-            for word in description.split(' '):
-                if _is_description_english(word):
-                    if column_len + len(word) > max_column:
-                        formatted_description += '\n      '
-                        column_len = 6
-                for c in word:
-                    column_len += self.get_east_asian_width_count(c)
-                    if column_len > max_column:
-                        formatted_description += '\n      '
-                        column_len -= max_column
-                    formatted_description += c
-                formatted_description += ' '
-                column_len += 1
-            return formatted_description
-
         def _format_programming_language(programming_language):
             if programming_language:
                 return u'\U0001F4D6 ' + programming_language + '  '
@@ -142,20 +167,23 @@ class GithubTrending(object):
             else:
                 return ''
 
-        formatted_repository  = click.style('  {0}.'.format(str(index)), fg=self.config.clr_view_index)
+        formatted_repository  = self.style('  {0}.'.format(str(index)), fg=self.config.clr_view_index)
         formatted_repository += ' ' * (3-len(str(index)))
-        formatted_repository += click.style(repository['User'] + '/', fg=self.config.clr_user)
-        formatted_repository += click.style(repository['Repository'] + '\n      ', fg=self.config.clr_rep_repository, bold=True)
-        description = _format_description(repository['Description'])
-        formatted_repository += click.style(description + '\n      ', fg=self.config.clr_description)
-        programming_language  = _format_programming_language(repository['Programming Language'])
-        formatted_repository += click.style(programming_language, fg=self.config.clr_programming_language)
-        total_stars           = _format_total_stars(repository['Total stars'])
-        formatted_repository += click.style(total_stars, fg=self.config.clr_total_stars)
-        forks                 = _format_forks(repository['Forks'])
-        formatted_repository += click.style(forks, fg=self.config.clr_forks)
-        formatted_repository += ' ' * _get_blank_num(repository)
-        formatted_repository += click.style(u'\U00002B50 ' + repository['Stars trending'] + '\n', fg=self.config.clr_total_stars)
+        formatted_repository += self.style(repository.user + '/', fg=self.config.clr_user)
+        formatted_repository += self.style(repository.repository + '\n      ', fg=self.config.clr_rep_repository, bold=True)
+        description = wrap_text(repository.description,
+                                min(self.columns, self.MAX_DESCRIPTION_COLUMN),
+                                indent=6) # header blanks
+        formatted_repository += self.style(description + '\n      ', fg=self.config.clr_description)
+        programming_language  = _format_programming_language(repository.programming_language)
+        formatted_repository += self.style(programming_language, fg=self.config.clr_programming_language)
+        total_stars           = format_count(repository.stars)
+        formatted_repository += self.style(_format_total_stars(total_stars), fg=self.config.clr_total_stars)
+        forks                 = format_count(repository.forks)
+        formatted_repository += self.style(_format_forks(forks), fg=self.config.clr_forks)
+        stars_trending        = repository.stars_trending_text
+        formatted_repository += ' ' * _get_blank_num(repository.programming_language, total_stars, forks, stars_trending)
+        formatted_repository += self.style(u'\U00002B50 ' + stars_trending + '\n', fg=self.config.clr_total_stars)
         return formatted_repository
 
     def format_developer(self, index, developer):
@@ -170,69 +198,154 @@ class GithubTrending(object):
             return owner, organization
 
         def _format_description(repository, description):
-            formatted_description = ''
-            col = self.MAX_COLUMN - self.get_east_asian_width_count(repository) - 6 - 4
+            formatted_description = []
+            col = self.columns - text_width(repository) - 6 - 4
             for c in description:
                 if col < 4:
-                    formatted_description += '.' * col
+                    formatted_description.append('.' * col)
                     break
-                else:
-                    formatted_description += c
-                col -= self.get_east_asian_width_count(c)
-            return formatted_description
+                formatted_description.append(c)
+                col -= char_width(c)
+            return ''.join(formatted_description)
 
-        formatted_developer  = click.style('  {0}.'.format(str(index)), fg=self.config.clr_view_index)
+        formatted_developer  = self.style('  {0}.'.format(str(index)), fg=self.config.clr_view_index)
         formatted_developer += ' ' * (3-len(str(index)))
-        owner, organization  = _get_owner_and_organization(developer['Developer'])
-        formatted_developer += click.style(owner + ' ', fg=self.config.clr_owner, bold=True)
-        formatted_developer += click.style(organization + '\n      ', fg=self.config.clr_organization, bold=True)
-        formatted_developer += click.style(u'\U0001F516  ' + developer['Repository'] + ' ', fg=self.config.clr_dev_repository)
-        description          = _format_description(developer['Repository'], developer['Description'])
-        formatted_developer += click.style(description + '\n', fg=self.config.clr_description)
+        owner, organization  = _get_owner_and_organization(developer.developer)
+        formatted_developer += self.style(owner + ' ', fg=self.config.clr_owner, bold=True)
+        formatted_developer += self.style(organization + '\n      ', fg=self.config.clr_organization, bold=True)
+        formatted_developer += self.style(u'\U0001F516  ' + developer.repository + ' ', fg=self.config.clr_dev_repository)
+        description          = _format_description(developer.repository, developer.description)
+        formatted_developer += self.style(description + '\n', fg=self.config.clr_description)
         return formatted_developer
 
+    def print_request_stats(self):
+        """Print the request counters if GitHub throttled or failed any request."""
+        stats = self.session.stats
+        if stats['throttled'] or stats['failed']:
+            click.secho('  {requests} requests: {throttled} throttled, {retried} retried, '
+                        '{failed} failed\n'.format(**stats), fg=self.config.clr_tooltip)
+
     def tip_view(self):
          """Create the tip about the view command."""
-         tip = click.style('  Tip: View the README for repository with the following command:\n', fg=self.config.clr_general)
-         tip += click.style('    gt view [user/repository] ', fg=self.config.clr_view_index)
-         tip += click.style('optional: [-b/--browser] [--help]\n', fg=self.config.clr_tooltip)
+         tip = self.style('  Tip: View the README for repository with the following command:\n', fg=self.config.clr_general)
+         tip += self.style('    gt view [user/repository] ', fg=self.config.clr_view_index)
+         tip += self.style('optional: [-b/--browser] [--help]\n', fg=self.config.clr_tooltip)
          return tip
 
-    def print_repository_not_found(self):
-        pass
+    def print_failures(self, failures):
+        """Print the items that could not be formatted, to stderr.
+
+        :type failures: list
+        :param failures: The (item, exception) pairs.
+        """
+        if not failures:
+            return
+        click.secho('  Could not show {0} item(s):'.format(len(failures)),
+                    fg=self.config.clr_error, err=True)
+        for item, e in failures:
+            click.secho('    {0}: {1}: {2}'.format(item.full_name, type(e).__name__, e),
+                        fg=self.config.clr_error, err=True)
+        click.echo('', err=True)
+
+    def write_output(self, text):
+        """Write text to stdout, replacing what its encoding cannot show.
+
+        :type text: str
+        :param text: The text to write.
+        """
+        try:
+            click.echo(text, nl=False)
+        except UnicodeEncodeError:
+            # The emoji cannot be written to terminals without UTF-8.
+            encoding = getattr(sys.stdout, 'encoding', None) or 'ascii'
+            click.echo(text.encode(encoding, 'replace').decode(encoding), nl=False)
+
+    def print_items(self, items, format_item, chunk_size=None):
+        """Print the formatted items in as few writes as possible.
+
+        The items are collected in a buffer which is written at the end, or
+        every chunk_size items to stream long listings.
 
-    def print_developer_not_found(self):
-        pass
+        :type items: list
+        :param items: The `TrendingRepository` or `TrendingDeveloper` items.
 
-    def print_repository(self, repositories):
-        self.config.repositories = {}
-        for index, repository in repositories.items():
+        :type format_item: function
+        :param format_item: Formats an item given its index and the item.
+
+        :type chunk_size: int
+        :param chunk_size: The number of items per write, 0 to write them
+            all at once. Defaults to OUTPUT_CHUNK_SIZE.
+
+        :rtype: list
+        :return: The items shown.
+        """
+        if chunk_size is None:
+            chunk_size = self.OUTPUT_CHUNK_SIZE
+        self.columns = self.get_columns()
+        self.style.color = use_color()
+        buffer = []
+        shown = []
+        failures = []
+        for index, item in enumerate(items, start=1):
             try:
-                formatted_repository = self.format_repository(index, repository)
-                click.echo(formatted_repository)
-                user_repository = repository['User'] + '/' + repository['Repository']
-                self.config.repositories[user_repository] = repository['Description']
-            except:
-                self.print_repository_not_found()
-        self.config.save_cache()
-        if self.config.show_tip:
+                formatted_item = format_item(index, item)
+            except Exception as e:
+                # A malformed item is reported instead of hiding the rest.
+                failures.append((item, e))
+                continue
+            buffer.append(formatted_item)
+            buffer.append('\n')
+            shown.append(item)
+            if chunk_size and len(shown) % chunk_size == 0:
+                self.write_output(''.join(buffer))
+                del buffer[:]
+        if buffer:
+            self.write_output(''.join(buffer))
+        self.print_failures(failures)
+        return shown
+
+    def save_repository_cache(self, items):
+        """Add the items to the repository cache for `view` completions.
+
+        :type items: list
+        :param items: The `TrendingRepository` or `TrendingDeveloper` shown.
+        """
+        self.repository_cache.refresh()
+        self.repository_cache.update(
+            dict((item.full_name, item.description) for item in items))
+        self.repository_cache.save()
+        self.config.create_config()
+
+    def print_repository(self, repositories, chunk_size=None, show_tip=True):
+        shown = self.print_items(repositories, self.format_repository, chunk_size)
+        self.save_repository_cache(shown)
+        if show_tip and self.config.show_tip:
             click.secho(self.tip_view())
 
-    def print_developer(self, developers):
-        self.config.repositories = {}
-        for index, developer in developers.items():
-            try:
-                formatted_developer = self.format_developer(index, developer)
-                click.echo(formatted_developer)
-                developer_repository = developer['Developer'].split(' (')[0] + \
-                                       '/' + developer['Repository']
-                self.config.repositories[developer_repository] = developer['Description']
-            except:
-                self.print_developer_not_found()
-        self.config.save_cache()
+    def print_developer(self, developers, chunk_size=None):
+        shown = self.print_items(developers, self.format_developer, chunk_size)
+        self.save_repository_cache(shown)
+
+    def print_records(self, rows, dev, output_format):
+        """Write the records as json, ndjson, csv or tsv to stdout.
 
+        The parsed records are written as they are, without formatting them
+        for the terminal, after the language, period and rank they have.
 
-    def trend(self, language, dev, weekly, monthly, browser, limit):
+        :type rows: iterable
+        :param rows: The `TrendingRepository` or `TrendingDeveloper` items
+            prefixed by `iter_rows`.
+
+        :type dev: bool
+        :param dev: Whether the records are developers.
+
+        :type output_format: str
+        :param output_format: The format to write.
+        """
+        record = TrendingDeveloper if dev else TrendingRepository
+        write_records(rows, PAGE_FIELDS + list(record._fields), output_format, sys.stdout)
+
+    def trend(self, language, dev, weekly, monthly, browser, limit, output_format=TEXT_FORMAT):
         """Display Github Trendings.
 
         :type dev: bool
@@ -240,9 +353,14 @@ class GithubTrending(object):
 
         :type limit: int
         :param limit: the number of repositories to show, optional. defaults to 10.
+
+        :type output_format: str
+        :param output_format: text to display the trendings, or the machine
+            readable format to write them in. ndjson is written as the page
+            is parsed.
         """
         def _create_url(language, dev, weekly, monthly):
-            url = 'https://github.com/trending'
+            url = get_base_url() + 'trending'
             if dev:
                 url += '/developers'
             if language:
@@ -257,29 +375,169 @@ class GithubTrending(object):
             url = _create_url(language, dev, weekly, monthly)
             click.secho('\nOpening ' + url + ' ...\n', fg=self.config.clr_general)
             webbrowser.open(url)
+        elif output_format != TEXT_FORMAT:
+            records = self.github_trending_api.iter_metadata(language, dev, weekly, monthly, limit)
+            if records is None:
+                sys.exit(1)
+            rows = iter_rows(records, language, get_period(weekly, monthly))
+            try:
+                self.print_records(rows, dev, output_format)
+            except PageReadError:
+                sys.exit(1)
         else:
             result = self.github_trending_api.get_metadata(language, dev, weekly, monthly, limit)
+            if result is None:
+                sys.exit(1)
             if dev:
                 self.print_developer(result)
             else:
                 self.print_repository(result)
 
+    def trend_languages(self, languages, dev, weekly, monthly, limit, max_workers,
+                        output_format=TEXT_FORMAT):
+        """Display Github Trendings for several languages at once.
+
+        The pages are fetched concurrently and printed in the given order.
+
+        :type languages: list
+        :param languages: The languages to show trendings for.
+
+        :type max_workers: int
+        :param max_workers: The maximum number of pages fetched at the same time.
+
+        :type output_format: str
+        :param output_format: text to display the trendings, or the machine
+            readable format to write the items of every language in.
+        """
+        queries = [TrendingQuery(language, dev, weekly, monthly) for language in languages]
+        results = self.github_trending_api.get_metadata_batch(queries, limit, max_workers)
+        if output_format != TEXT_FORMAT:
+            period = get_period(weekly, monthly)
+            rows = []
+            for query in queries:
+                if results[query] is None:
+                    click.secho('Error: Could not fetch ' + query.language + ' trending',
+                                fg=self.config.clr_error, err=True)
+                else:
+                    rows.extend(iter_rows(results[query], query.language, period))
+            self.print_records(rows, dev, output_format)
+            return
+        for query in queries:
+            click.secho('\n  ' + query.language + '\n', fg=self.config.clr_general, bold=True)
+            if results[query] is None:
+                click.secho('  Error: Could not fetch ' + query.language + ' trending\n',
+                            fg=self.config.clr_error)
+            elif dev:
+                self.print_developer(results[query])
+            else:
+                self.print_repository(results[query], show_tip=False)
+        # The tip is shown once after every language.
+        if not dev and self.config.show_tip:
+            click.secho(self.tip_view())
+        self.print_request_stats()
+
+    def format_rank_change(self, change):
+        """Format an item of a snapshot diff.
+
+        :type change: :class:`snapshot_diff.RankChange`
+        :param change: An instance of `snapshot_diff.RankChange`.
+
+        :rtype: str
+        :return: The formatted rank change.
+        """
+        rank = change.old_rank if change.new_rank is None else change.new_rank
+        formatted_change  = self.style('  {0}.'.format(rank), fg=self.config.clr_view_index)
+        formatted_change += ' ' * (3-len(str(rank)))
+        formatted_change += self.style(change.item.key + ' ', fg=self.config.clr_user, bold=True)
+        if change.old_rank is None:
+            formatted_change += self.style('new', fg=self.config.clr_forks)
+        elif change.new_rank is None:
+            formatted_change += self.style('dropped', fg=self.config.clr_error)
+        elif change.rank_delta > 0:
+            formatted_change += self.style(u'\u25B2 {0} (was {1})'.format(change.rank_delta, change.old_rank),
+                                           fg=self.config.clr_forks)
+        else:
+            formatted_change += self.style(u'\u25BC {0} (was {1})'.format(-change.rank_delta, change.old_rank),
+                                           fg=self.config.clr_error)
+        if change.stars_trending_delta:
+            formatted_change += self.style(u'  \U00002B50 {0:+,}'.format(change.stars_trending_delta),
+                                           fg=self.config.clr_total_stars)
+        return formatted_change
+
+    def print_snapshot_diff(self, snapshot_diff, taken_at):
+        """Print the new, moved and dropped items of a snapshot diff.
+
+        :type snapshot_diff: :class:`snapshot_diff.SnapshotDiff`
+        :param snapshot_diff: An instance of `snapshot_diff.SnapshotDiff`.
+
+        :type taken_at: float
+        :param taken_at: When the older snapshot was taken.
+        """
+        since = time.strftime('%Y-%m-%d %H:%M', time.localtime(taken_at))
+        if not snapshot_diff.has_changes():
+            click.secho('\n  No changes since ' + since + '\n', fg=self.config.clr_general)
+            return
+        click.secho('\n  Changes since ' + since, fg=self.config.clr_general)
+        self.style.color = use_color()
+        for title, changes in (('New', snapshot_diff.new),
+                               ('Moved', snapshot_diff.moved),
+                               ('Dropped', snapshot_diff.dropped)):
+            if changes:
+                click.secho('\n  ' + title, fg=self.config.clr_general, bold=True)
+                for change in changes:
+                    click.echo(self.format_rank_change(change))
+        click.echo('')
+
+    def diff(self, language, dev, weekly, monthly, hours, limit):
+        """Display the changes of a Github Trending page since a snapshot.
+
+        The latest snapshot taken at least `hours` ago is compared with the
+        page as it is now.
+
+        :type hours: int
+        :param hours: The minimum age of the snapshot to compare with.
+
+        :type limit: int
+        :param limit: The number of items to compare.
+        """
+        store = self.github_trending_api.store
+        period = get_period(weekly, monthly)
+        started_at = time.time()
+        taken_at, old_items = store.get_latest(language, period, dev,
+                                               before=started_at - hours * 60 * 60)
+        new_items = self.github_trending_api.get_metadata(language, dev, weekly, monthly, limit)
+        if new_items is None:
+            sys.exit(1)
+        if old_items is None:
+            # Only a fetched page is saved, not one served from the HTTP cache.
+            latest_at, _ = store.get_latest(language, period, dev)
+            if latest_at is None or latest_at >= started_at:
+                if latest_at is None:
+                    store.save(new_items, language, period, dev)
+                click.secho('No snapshot to compare with yet, the current trending was saved '
+                            'for the next diff.', fg=self.config.clr_tooltip)
+            else:
+                since = time.strftime('%Y-%m-%d %H:%M', time.localtime(latest_at))
+                click.secho('No snapshot to compare with yet, the latest was saved at ' + since +
+                            '.', fg=self.config.clr_tooltip)
+            return
+        self.print_snapshot_diff(diff_snapshots(old_items, new_items), taken_at)
+
     def view(self, repository, browser):
         """Display View repository README."""
         if browser:
-            url = 'https://github.com/' + repository
+            url = get_base_url() + repository
             click.secho('\nOpening ' + url + ' ...\n', fg=self.config.clr_general)
             webbrowser.open(url)
         else:
-            for md in ['README.md', 'README.rst', 'README.txt', 'README']:
-                url = 'https://raw.githubusercontent.com/' + repository + '/master/' + md
-                res = requests.get(url, stream=True)
-                if res.status_code == 200:
-                    click.secho('\nOpening ' + url + ' ...\n', fg=self.config.clr_general)
-                    header = click.style('Viewing ' + url + '\n', fg=self.config.clr_general)
-                    content = mdv.main(md=res.text, L=True, l=True)
-                    click.echo_via_pager(header + content)
-                    return
-            click.secho('Error: ' + repository + ' is not found.', fg=self.config.clr_error)
-
-
+            url, res = self.readme_locator.find(repository)
+            if res is None:
+                click.secho('Error: ' + repository + ' is not found.', fg=self.config.clr_error)
+                return
+            click.secho('\nOpening ' + url + ' ...\n', fg=self.config.clr_general)
+            header = click.style('Viewing ' + url + '\n', fg=self.config.clr_general)
+            # The markdown viewer pulls in markdown and pygments, only load
+            # it to render a README.
+            from .lib.mdv import markdownviewer as mdv
+            content = mdv.main(md=res.text, L=True, l=True)
+            click.echo_via_pager(header + content)
@@ -20,7 +20,8 @@ from __future__ import division
 import click
 
 from .github_trending import GithubTrending
-from .lib.github.github import ACCEPTED_LANGUAGES
+from .lib.github.github import ACCEPTED_LANGUAGES, MAX_WORKERS
+from .record_writer import OUTPUT_FORMATS, TEXT_FORMAT
 
 
 pass_github_trending = click.make_pass_decorator(GithubTrending)
@@ -38,25 +39,34 @@ class GithubTrendingCli(object):
         :param ctx: An instance of click.core.Context that stores an instance
             of `github_trending.GtihubTrending`.
         """
-        # Create a GithubTrending object and remember it as the context object.
+        # Create a GithubTrending object and remember it as the context object,
+        # unless the interactive shell passed its own warm one.
         # From this point onwards other commands can refer to it by using the
         # @pass_github_trending decorator.
-        ctx.obj = GithubTrending()
+        if ctx.obj is None:
+            ctx.obj = GithubTrending()
 
     @cli.command()
     @click.option('--language', '-la', help='View specific language trending')
+    @click.option('--languages', help='View several languages trending, comma separated or "all"')
+    @click.option('--concurrency', default=MAX_WORKERS, help='Limits the number of pages fetched at once')
     @click.option('--dev', '-d', is_flag=True, help='View developers trending')
     @click.option('--weekly', '-w', is_flag=True, help='View 1 week trending')
     @click.option('--monthly', '-m', is_flag=True, help='View 1 month trending')
     @click.option('--browser', '-b', is_flag=True, help='View in a browser instead of the terminal')
     @click.option('--limit', '-li', default=25, help='Limits the number of items displayed')
+    @click.option('--format', '-f', 'output_format', type=click.Choice(OUTPUT_FORMATS),
+                  default=TEXT_FORMAT, help='Write the items as json, ndjson, csv or tsv instead')
     @pass_github_trending
-    def trend(github_trending, language, dev, weekly, monthly, browser, limit):
+    def trend(github_trending, language, languages, concurrency, dev, weekly, monthly, browser, limit,
+              output_format):
         """Display Github trendings.
 
         Example(s):
             gt trend
             gt trend 5
+            gt trend --languages python,go,rust
+            gt trend --format ndjson
 
         :type github_trending: :class:`github_treding.GithubTrending`
         :param github_trending: An instance of `github_trending.GithubTrending`.
@@ -64,6 +74,65 @@ class GithubTrendingCli(object):
         :type limit: int
         :param limit: specifies the number of items to show.
             Optional, defaults to 10.
+
+        :type languages: str
+        :param languages: comma separated languages to fetch concurrently,
+            or "all" for every accepted language.
+
+        :type concurrency: int
+        :param concurrency: the maximum number of pages fetched at once.
+
+        :type output_format: str
+        :param output_format: text, or json, ndjson, csv or tsv to write the
+            parsed items for other tools.
+        """
+        if language and language.lower() not in ACCEPTED_LANGUAGES:
+            click.secho('Error: Specified programming language not in supported languages')
+            return
+        if weekly and monthly:
+            click.secho('Error: Please specify weekly OR monthly')
+            return
+        if browser and output_format != TEXT_FORMAT:
+            click.secho('Error: --format cannot be combined with --browser')
+            return
+        if languages:
+            if language or browser:
+                click.secho('Error: --languages cannot be combined with --language or --browser')
+                return
+            if languages.lower() == 'all':
+                languages = ACCEPTED_LANGUAGES
+            else:
+                languages = [l.strip().lower() for l in languages.split(',') if l.strip()]
+            if any(l not in ACCEPTED_LANGUAGES for l in languages):
+                click.secho('Error: Specified programming language not in supported languages')
+                return
+            github_trending.trend_languages(languages, dev, weekly, monthly, limit, max(concurrency, 1),
+                                            output_format)
+            return
+
+        github_trending.trend(language, dev, weekly, monthly, browser, limit, output_format)
+
+    @cli.command()
+    @click.option('--language', '-la', help='Diff specific language trending')
+    @click.option('--dev', '-d', is_flag=True, help='Diff developers trending')
+    @click.option('--weekly', '-w', is_flag=True, help='Diff 1 week trending')
+    @click.option('--monthly', '-m', is_flag=True, help='Diff 1 month trending')
+    @click.option('--hours', default=0, help='Compare with the latest snapshot at least this old')
+    @click.option('--limit', '-li', default=25, help='Limits the number of items compared')
+    @pass_github_trending
+    def diff(github_trending, language, dev, weekly, monthly, hours, limit):
+        """Display new, dropped and moved trendings since a snapshot.
+
+        Example(s):
+            gt diff
+            gt diff --language python --hours 24
+
+        :type github_trending: :class:`github_treding.GithubTrending`
+        :param github_trending: An instance of `github_trending.GithubTrending`.
+
+        :type hours: int
+        :param hours: the minimum age in hours of the snapshot to compare
+            with. Optional, defaults to 0, the previous snapshot.
         """
         if language and language.lower() not in ACCEPTED_LANGUAGES:
             click.secho('Error: Specified programming language not in supported languages')
@@ -72,7 +141,7 @@ class GithubTrendingCli(object):
             click.secho('Error: Please specify weekly OR monthly')
             return
 
-        github_trending.trend(language, dev, weekly, monthly, browser, limit)
+        github_trending.diff(language, dev, weekly, monthly, hours, limit)
 
     @cli.command(help='View README of repository(ex:blue-9/github-trending)')
     @click.argument('repository')
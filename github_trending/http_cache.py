@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import hashlib
+import io
+import json
+import os
+import time
+
+from .storage import write_file_atomic
+
+
+class CacheEntry(object):
+    """A cached page with its HTTP validators and parsed result.
+
+    :type url: str
+    :param url: The url the page was fetched from.
+
+    :type body: str
+    :param body: The page body, None if the page was not read to the end.
+
+    :type etag: str
+    :param etag: The `ETag` response header, if any.
+
+    :type last_modified: str
+    :param last_modified: The `Last-Modified` response header, if any.
+
+    :type fetched_at: float
+    :param fetched_at: When the page was last fetched or revalidated.
+
+    :type parsed: dict
+    :param parsed: The parsed items and the limit they were parsed with.
+
+    :type VERSION: int (const)
+    :param VERSION: The entry format version, entries of other versions are
+        cache misses.
+    """
+
+    VERSION = 2
+
+    def __init__(self, url, body, etag=None, last_modified=None,
+                 fetched_at=None, parsed=None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.parsed = parsed
+
+    def is_fresh(self, ttl):
+        """Determine if the entry can be served without revalidation.
+
+        :type ttl: int
+        :param ttl: The number of seconds an entry stays fresh.
+
+        :rtype: bool
+        :return: Specifies whether the entry is still fresh.
+        """
+        return time.time() - self.fetched_at < ttl
+
+    def touch(self):
+        """Mark the entry as just revalidated."""
+        self.fetched_at = time.time()
+
+    def validators(self):
+        """Create the conditional request headers for the entry.
+
+        :rtype: dict
+        :return: The `If-None-Match` and `If-Modified-Since` headers.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def can_serve(self, limit):
+        """Determine if the entry has enough of the page for the given limit.
+
+        :type limit: int
+        :param limit: The number of items requested.
+
+        :rtype: bool
+        :return: Specifies whether the entry has the body or enough items.
+        """
+        return self.body is not None or self.get_parsed(limit) is not None
+
+    def get_parsed(self, limit):
+        """Get the stored parsed items if they cover the given limit.
+
+        :type limit: int
+        :param limit: The number of items requested.
+
+        :rtype: list
+        :return: The parsed items, or None if they have to be parsed again.
+        """
+        if not self.parsed:
+            return None
+        items = self.parsed['items']
+        # Fewer items than the limit they were parsed with means the whole
+        # page was parsed, so any limit can be served.
+        if limit <= self.parsed['limit'] or len(items) < self.parsed['limit']:
+            return items[:limit]
+        return None
+
+    def set_parsed(self, items, limit):
+        """Store the parsed items of the page.
+
+        :type items: list
+        :param items: The parsed items.
+
+        :type limit: int
+        :param limit: The limit the items were parsed with.
+        """
+        self.parsed = {'limit': limit, 'items': items}
+
+    def to_dict(self):
+        """Convert the entry to a JSON serializable dict.
+
+        :rtype: dict
+        :return: The entry as a dict.
+        """
+        return {
+            'version': self.VERSION,
+            'url': self.url,
+            'body': self.body,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'fetched_at': self.fetched_at,
+            'parsed': self.parsed,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create an entry from the output of `to_dict`.
+
+        :type data: dict
+        :param data: The entry as a dict.
+
+        :rtype: :class:`CacheEntry`
+        :return: An instance of `CacheEntry`.
+        :raises: :class:`ValueError` if the entry has another format version.
+        """
+        if data.get('version') != cls.VERSION:
+            raise ValueError('Unsupported cache entry version')
+        return cls(data['url'], data['body'], data['etag'],
+                   data['last_modified'], data['fetched_at'], data['parsed'])
+
+
+class HttpCache(object):
+    """On-disk HTTP cache of trending pages.
+
+    Entries are stored one JSON file per url under the user's cache dir.
+    Fresh entries are served without touching the network, stale ones are
+    revalidated with `If-None-Match`/`If-Modified-Since`.
+
+    :type cache_dir: str
+    :param cache_dir: The directory the entries are stored in.
+
+    :type ttl: int
+    :param ttl: The number of seconds an entry is served without revalidation.
+    """
+
+    CACHE_DIR = 'github-trending'
+    HTTP_CACHE_DIR = 'http'
+    TTL = 300
+
+    def __init__(self, cache_dir=None, ttl=TTL):
+        self.cache_dir = cache_dir or os.path.join(self.get_cache_dir(),
+                                                   self.HTTP_CACHE_DIR)
+        self.ttl = ttl
+
+    @classmethod
+    def get_cache_dir(cls):
+        """Get the github-trending directory in the user's cache dir.
+
+        :rtype: str
+        :return: The cache dir path, $XDG_CACHE_HOME or ~/.cache based.
+        """
+        cache_home = os.getenv('XDG_CACHE_HOME')
+        if not cache_home:
+            home = os.path.abspath(os.getenv('HOME', ''))
+            cache_home = os.path.join(home, '.cache')
+        return os.path.join(cache_home, cls.CACHE_DIR)
+
+    def get_entry_path(self, url):
+        """Get the path of the entry for the given url.
+
+        :type url: str
+        :param url: The cached url.
+
+        :rtype: str
+        :return: The entry file path.
+        """
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, url):
+        """Load the entry for the given url.
+
+        :type url: str
+        :param url: The cached url.
+
+        :rtype: :class:`CacheEntry`
+        :return: The cached entry, or None if there is no usable entry.
+        """
+        try:
+            with io.open(self.get_entry_path(url), encoding='utf-8') as entry_file:
+                entry = CacheEntry.from_dict(json.load(entry_file))
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            # A missing or corrupted entry is just a cache miss.
+            return None
+        if entry.url != url:
+            return None
+        return entry
+
+    def set(self, entry):
+        """Store the entry, replacing any previous one for its url.
+
+        :type entry: :class:`CacheEntry`
+        :param entry: The entry to store.
+        """
+        try:
+            write_file_atomic(self.get_entry_path(entry.url),
+                              json.dumps(entry.to_dict()))
+        except (IOError, OSError):
+            # Without the entry the page is only fetched again next time.
+            pass
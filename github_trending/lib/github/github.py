@@ -23,10 +23,18 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
+
 import click
+from collections import namedtuple
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+
+# requests, lxml, bs4, sqlite3 and concurrent.futures are imported where they
+# are used, so importing the constants of this module for the command line
+# stays cheap.
+from ...http_cache import CacheEntry
+from ...snapshot_store import get_period
+from .records import TrendingDeveloper, TrendingRepository, parse_count, parse_stars_trending
 
 # Constants
 ACCEPTED_LANGUAGES = [
@@ -35,13 +43,47 @@ ACCEPTED_LANGUAGES = [
     'rust', 'coffeescript', 'haskell', 'groovy', 'lua', 'elixir',
     'perl', 'kotlin', 'clojure'
 ]
+MAX_WORKERS = 4
+PARSERS = ['lxml', 'bs4']
+BASE_URL = 'https://github.com/'
+BASE_URL_ENV = 'GITHUB_TRENDING_BASE_URL'
+
+# A single trending page, used to key batch results
+TrendingQuery = namedtuple('TrendingQuery', ['language', 'dev', 'weekly', 'monthly'])
+
+
+def get_base_url(base_url=None):
+    """
+    Get the GitHub url, GITHUB_TRENDING_BASE_URL overrides the default
+    to point gt at a local server like benchmarks/fake_github.py
+    :return The url, with a trailing slash
+    """
+    base_url = base_url or os.getenv(BASE_URL_ENV) or BASE_URL
+    return base_url if base_url.endswith('/') else base_url + '/'
+
+
+class PageReadError(Exception):
+    """The connection to GitHub failed while the page was being read"""
+
 
 # Repository information parsing functions
 class GithubTrendingApi(object):
     """Encapsulate the Github Trending API."""
 
-    def __init__(self):
-        self.base_url = 'https://github.com/'
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, session=None, cache=None, parser=PARSERS[0], store=None,
+                 base_url=None):
+        if parser not in PARSERS:
+            raise ValueError('Unknown parser: ' + parser)
+        if session is None:
+            from ...session import HttpSession
+            session = HttpSession()
+        self.session = session
+        self.cache = cache
+        self.store = store
+        self.parser = parser
+        self.base_url = get_base_url(base_url)
         self.trending_url = self.base_url + 'trending/'
         self.xml_declaration = '<?xml version="1.0" encoding="UTF-8" ?>\n'
         self.recode = '\t<record>\n'
@@ -113,24 +155,25 @@ class GithubTrendingApi(object):
     def parse_repositories_info(self, tag, limit):
         """
         Scrape trending repository info
-        :return A dictionary of all trending repositories filtered by arguments from user
+        :return A list of all trending repositories filtered by arguments from user
         """
-        trending = {}
+        trending = []
         for content in tag:
             repositories = content.find_all('li')
             for index, list_item in enumerate(repositories, start=1):
                 username, repo_name = self.username_and_reponame(list_item)
                 stars, forks = self.stars_and_forks(list_item)
-                trending[index] = {
-                    'User': username,
-                    'Repository': repo_name,
-                    'URL': self.base_url + '/'.join((username, repo_name)),
-                    'Description': self.get_description(list_item),
-                    'Programming Language': self.get_programming_language(list_item),
-                    'Total stars': stars,
-                    'Forks': forks,
-                    'Stars trending': self.get_stars_trending(list_item)
-                }
+                stars_trending, since = parse_stars_trending(self.get_stars_trending(list_item))
+                trending.append(TrendingRepository(
+                    user=username,
+                    repository=repo_name,
+                    url=self.base_url + '/'.join((username, repo_name)),
+                    description=self.get_description(list_item),
+                    programming_language=self.get_programming_language(list_item),
+                    stars=parse_count(stars),
+                    forks=parse_count(forks),
+                    stars_trending=stars_trending,
+                    since=since))
                 if index >= limit:
                     return trending
         return trending
@@ -183,21 +226,20 @@ class GithubTrendingApi(object):
     def parse_developers_info(self, tag, limit):
         """
         Scrape trending developer info
-        :return A dictionary with all trending developers filtered by arguments from user
+        :return A list with all trending developers filtered by arguments from user
         """
-        trending = {}
+        trending = []
         for content in tag:
             repositories = content.find_all('li')
             for index, list_item in enumerate(repositories, start=1):
                 repo_name, url = self.get_developer_repo(list_item)
                 description = self.get_developer_repo_description(list_item)
-                trending[index] = {
-                    'Developer': self.get_developer(list_item),
-                    'Profile': self.get_profile(list_item),
-                    'Repository': repo_name,
-                    'URL': url,
-                    'Description': description
-                }
+                trending.append(TrendingDeveloper(
+                    developer=self.get_developer(list_item),
+                    profile=self.get_profile(list_item),
+                    repository=repo_name,
+                    url=url,
+                    description=description))
                 if index >= limit:
                     return trending
         return trending
@@ -208,15 +250,25 @@ class GithubTrendingApi(object):
 
     # All around functions
 
-    def make_connection(self, url):
-        """Establish connection with url"""
-        page = requests.get(url)
-        if page.status_code != 200:
+    def make_connection(self, url, headers=None):
+        """
+        Establish connection with url
+        :return The page, or None if GitHub could not be reached or kept throttling
+        """
+        import requests
+        try:
+            page = self.session.get(url, headers=headers, stream=True)
+        except requests.exceptions.RequestException:
+            click.secho('Error: Could not establish connection with GitHub', fg='red', err=True)
+            return None
+        if page.status_code not in (200, 304):
+            # Release the unread connection back to the pool.
+            page.close()
             if page.status_code == 429:
-                click.secho('Error: Too many requests', fg='red')
+                click.secho('Error: Too many requests', fg='red', err=True)
             else:
-                click.secho('Error: Could not establish connection with GitHub', fg='red')
-            exit(1)
+                click.secho('Error: Could not establish connection with GitHub', fg='red', err=True)
+            return None
         return page
 
 
@@ -243,14 +295,169 @@ class GithubTrendingApi(object):
         return url
 
 
-    def get_metadata(self, language, dev, weekly, monthly, limit):
-        """Build URL, connect to page and create BeautifulSoup object, build and return result"""
-        url = self.build_url(language=language, dev=dev, monthly=monthly, weekly=weekly)
-        page = self.make_connection(url)
-        soup = BeautifulSoup(page.text, 'lxml')
+    def parse_page(self, text, dev, limit):
+        """
+        Parse page text with the selected parser, build and return result
+        The lxml parser reads every field with precompiled XPath expressions,
+        the bs4 parser builds a BeautifulSoup object and walks it
+        """
+        if self.parser == 'lxml':
+            from .lxml_parser import LxmlParser
+            parser = LxmlParser(self.base_url)
+            if dev:
+                return parser.parse_developers(text, limit)
+            return parser.parse_repositories(text, limit)
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(text, 'lxml')
         explore_content = soup.select('.explore-content')
         if dev:
-            result = self.parse_developers_info(explore_content, limit)
+            return self.parse_developers_info(explore_content, limit)
+        return self.parse_repositories_info(explore_content, limit)
+
+
+    def iter_page(self, page, dev, limit, body):
+        """
+        Parse the page, streaming it through the lxml parser
+        Each item is yielded as soon as it is parsed, and reading stops as soon as
+        limit items were parsed, so small limits download and build only the top of the page
+        :param body: A list the page text is appended to once the page was read to the end
+        :return A generator of TrendingRepository or TrendingDeveloper
+        """
+        if self.parser != 'lxml':
+            text = page.text
+            body.append(text)
+            for item in self.parse_page(text, dev, limit):
+                yield item
+            return
+        encoding = page.encoding or 'utf-8'
+        chunks = []
+
+        def _read_chunks():
+            for chunk in page.iter_content(self.CHUNK_SIZE):
+                chunks.append(chunk)
+                yield chunk
+
+        from .lxml_parser import LxmlParser
+        parser = LxmlParser(self.base_url)
+        parse_item = parser.parse_developer if dev else parser.parse_repository
+        count = 0
+        for _, item in parser.iter_parse(_read_chunks(), parse_item, limit, encoding):
+            count += 1
+            yield item
+        if count >= limit:
+            page.close()
+            return
+        body.append(b''.join(chunks).decode(encoding, 'replace'))
+
+
+    def save_items(self, entry, items, language, dev, weekly, monthly, fetched):
+        """
+        Cache the page entry, and save the items as a snapshot if the page was fetched
+        or revalidated
+        """
+        if self.cache is not None:
+            self.cache.set(entry)
+        if fetched and self.store is not None:
+            import sqlite3
+            try:
+                self.store.save(items, language, get_period(weekly, monthly), dev)
+            except (sqlite3.Error, OSError):
+                # Snapshots are best effort and never fail a fetch.
+                pass
+
+
+    def iter_fetched_page(self, url, page, language, dev, weekly, monthly, limit):
+        """
+        Yield the items of a fetched page as they are parsed
+        The page is cached and saved as a snapshot once every item was read
+        :raise PageReadError if the connection failed while the page was read,
+            nothing is cached then
+        """
+        import requests
+        body = []
+        items = []
+        try:
+            for item in self.iter_page(page, dev, limit, body):
+                items.append(item)
+                yield item
+        except requests.exceptions.RequestException as e:
+            page.close()
+            click.secho('Error: Could not establish connection with GitHub', fg='red', err=True)
+            raise PageReadError(e)
+        entry = CacheEntry(url, body[0] if body else None,
+                           etag=page.headers.get('ETag'),
+                           last_modified=page.headers.get('Last-Modified'))
+        entry.set_parsed([list(item) for item in items], limit)
+        self.save_items(entry, items, language, dev, weekly, monthly, True)
+
+
+    def iter_metadata(self, language, dev, weekly, monthly, limit):
+        """
+        Build URL, serve it from the cache or connect to page, and iterate over the result
+        The items of a fetched page are yielded as soon as they are parsed, before the rest
+        of the page is downloaded
+        A stale cached page is revalidated and not parsed again when GitHub answers 304
+        Every page fetched or revalidated is saved as a snapshot in the store
+        :return An iterator of TrendingRepository or TrendingDeveloper, or None if the page
+            could not be fetched
+        :raise PageReadError while iterating if the connection failed mid-page
+        """
+        url = self.build_url(language=language, dev=dev, monthly=monthly, weekly=weekly)
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and not entry.can_serve(limit):
+            # Only the top of the page was read last time.
+            entry = None
+        fetched = entry is None or not entry.is_fresh(self.cache.ttl)
+        if fetched:
+            headers = entry.validators() if entry is not None else None
+            page = self.make_connection(url, headers=headers)
+            if page is None:
+                return None
+            if page.status_code != 304 or entry is None:
+                return self.iter_fetched_page(url, page, language, dev, weekly, monthly, limit)
+            # Release the connection of the empty 304 back to the pool.
+            page.close()
+            entry.touch()
+        record = TrendingDeveloper if dev else TrendingRepository
+        items = entry.get_parsed(limit)
+        if items is not None:
+            items = [record(*item) for item in items]
         else:
-            result = self.parse_repositories_info(explore_content, limit)
+            items = self.parse_page(entry.body, dev, limit)
+            entry.set_parsed([list(item) for item in items], limit)
+        self.save_items(entry, items, language, dev, weekly, monthly, fetched)
+        return iter(items)
+
+
+    def get_metadata(self, language, dev, weekly, monthly, limit):
+        """
+        Build URL, serve it from the cache or connect to page, build and return result
+        :return A list of TrendingRepository or TrendingDeveloper, or None if the page
+            could not be fetched or read to the end
+        """
+        items = self.iter_metadata(language, dev, weekly, monthly, limit)
+        if items is None:
+            return None
+        try:
+            return list(items)
+        except PageReadError:
+            return None
+
+
+    def get_metadata_batch(self, queries, limit, max_workers=MAX_WORKERS):
+        """
+        Fetch and parse many trending pages concurrently
+        :param queries: An iterable of TrendingQuery (language, dev, weekly, monthly)
+        :param max_workers: The maximum number of pages fetched at the same time
+        :return A dictionary of get_metadata results keyed by TrendingQuery,
+            None for the pages that could not be fetched
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        queries = [TrendingQuery(*query) for query in queries]
+        result = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = dict((executor.submit(self.get_metadata, limit=limit, **query._asdict()), query)
+                           for query in queries)
+            for future in as_completed(futures):
+                result[futures[future]] = future.result()
         return result
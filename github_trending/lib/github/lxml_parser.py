@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from lxml import etree
+
+from .records import TrendingDeveloper, TrendingRepository, parse_count, parse_stars_trending
+
+
+def has_class(name):
+    """Build an XPath predicate matching one token of the class attribute"""
+    return 'contains(concat(" ", normalize-space(@class), " "), " {0} ")'.format(name)
+
+
+def element_has_class(element, name):
+    """Return whether one token of the element class attribute is name"""
+    return name in (element.get('class') or '').split()
+
+
+class LxmlParser(object):
+    """
+    Extract trending repositories and developers straight from an lxml tree
+    Every field is read with an XPath expression compiled once for all pages,
+    and the results are the same as the BeautifulSoup functions of GithubTrendingApi
+    """
+
+    EXPLORE_CONTENT = etree.XPath('//*[' + has_class('explore-content') + ']')
+    LIST_ITEMS = etree.XPath('.//li')
+    TEXT = etree.XPath('string()')
+
+    # Repository fields
+    REPO_HREF = etree.XPath('string((.//a)[1]/@href)')
+    DESCRIPTION = etree.XPath('string((.//p)[1])')
+    PROGRAMMING_LANGUAGE = etree.XPath('string((.//span[@itemprop="programmingLanguage"])[1])')
+    STARS_AND_FORKS = etree.XPath('.//a[' + has_class('muted-link') + ']')
+    STARS_TRENDING = etree.XPath('string((.//span[' + has_class('float-sm-right') + '])[1])')
+
+    # Developer fields
+    DEVELOPER_LINK = etree.XPath('(.//h2)[1]/descendant::a[1]')
+    DEVELOPER_REPO_LINK = etree.XPath('(.//a[' + has_class('repo-snipit') + '])[1]')
+    DEVELOPER_REPO_NAME = etree.XPath('(.//span)[1]')
+    DEVELOPER_REPO_DESCRIPTION = etree.XPath(
+        'string((.//*[@class="repo-snipit-description css-truncate-target"])[1])')
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+
+    def parse_tree(self, text):
+        """Build the lxml tree of a trending page"""
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+        return etree.fromstring(text, etree.HTMLParser(encoding='utf-8'))
+
+
+    def text(self, element):
+        """Return the stripped text content of element"""
+        return self.TEXT(element).strip()
+
+
+    def parse_repository(self, list_item):
+        """Return a trending repository from its <li> element"""
+        data = self.REPO_HREF(list_item).split('/')
+        username = data[1] if len(data) > 1 else ''
+        repo_name = data[2] if len(data) > 2 else ''
+        stars_and_forks = self.STARS_AND_FORKS(list_item)
+        stars = self.text(stars_and_forks[0]) if len(stars_and_forks) > 0 else ''
+        forks = self.text(stars_and_forks[1]) if len(stars_and_forks) > 1 else ''
+        stars_trending, since = parse_stars_trending(self.STARS_TRENDING(list_item).strip())
+        return TrendingRepository(
+            user=username,
+            repository=repo_name,
+            url=self.base_url + '/'.join((username, repo_name)),
+            description=self.DESCRIPTION(list_item).strip(),
+            programming_language=self.PROGRAMMING_LANGUAGE(list_item).strip(),
+            stars=parse_count(stars),
+            forks=parse_count(forks),
+            stars_trending=stars_trending,
+            since=since)
+
+
+    def parse_developer(self, list_item):
+        """Return a trending developer from its <li> element"""
+        developer, profile = '', ''
+        link = self.DEVELOPER_LINK(list_item)
+        if link:
+            developer = ' '.join(self.text(link[0]).split())
+            if link[0].get('href') is not None:
+                profile = self.base_url + link[0].get('href')
+        repo_name, url = '', ''
+        repo_link = self.DEVELOPER_REPO_LINK(list_item)
+        if repo_link and repo_link[0].get('href') is not None:
+            name = self.DEVELOPER_REPO_NAME(repo_link[0])
+            if name:
+                repo_name = self.text(name[0])
+                url = self.base_url + repo_link[0].get('href').strip()
+        return TrendingDeveloper(
+            developer=developer,
+            profile=profile,
+            repository=repo_name,
+            url=url,
+            description=self.DEVELOPER_REPO_DESCRIPTION(list_item).strip())
+
+
+    def parse(self, text, parse_item, limit):
+        """
+        Parse every <li> of the explore content with parse_item
+        :return A list of the parsed items
+        """
+        trending = []
+        for content in self.EXPLORE_CONTENT(self.parse_tree(text)):
+            for index, list_item in enumerate(self.LIST_ITEMS(content), start=1):
+                trending.append(parse_item(list_item))
+                if index >= limit:
+                    return trending
+        return trending
+
+
+    def iter_parse(self, chunks, parse_item, limit, encoding='utf-8'):
+        """
+        Parse the page incrementally from an iterable of byte chunks
+        Each item is yielded as soon as its </li> is read, and no more chunks
+        are consumed once limit items were yielded
+        :return A generator of (1-based rank, parsed item)
+        """
+        parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        depth = 0
+        index = 0
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if element_has_class(element, 'explore-content'):
+                    if event == 'start':
+                        depth += 1
+                        index = 0
+                    else:
+                        depth -= 1
+                elif event == 'end' and depth and element.tag == 'li':
+                    index += 1
+                    yield index, parse_item(element)
+                    if index >= limit:
+                        return
+                    # Drop the parsed items so the tree stays small.
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+        parser.close()
+        for event, element in parser.read_events():
+            if event == 'end' and depth and element.tag == 'li':
+                index += 1
+                yield index, parse_item(element)
+                if index >= limit:
+                    return
+
+
+    def parse_repositories(self, text, limit):
+        """Return a list of the trending repositories of the page"""
+        return self.parse(text, self.parse_repository, limit)
+
+
+    def parse_developers(self, text, limit):
+        """Return a list of the trending developers of the page"""
+        return self.parse(text, self.parse_developer, limit)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from collections import namedtuple
+
+
+def parse_count(text):
+    """
+    Parse a count displayed by GitHub like "1,234"
+    :return The count as an int, or None if there is no count
+    """
+    try:
+        return int(text.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def parse_stars_trending(text):
+    """
+    Split stars trending like "1,234 stars today" into its count and period
+    :return The count as an int or None, and the period like "today"
+    """
+    count, _, since = text.partition(' ')
+    return parse_count(count), since.partition(' ')[2]
+
+
+def format_count(count):
+    """Format a count the way GitHub displays it, '' if there is no count"""
+    return '' if count is None else '{0:,}'.format(count)
+
+
+class TrendingRepository(namedtuple('TrendingRepository', [
+        'user', 'repository', 'url', 'description', 'programming_language',
+        'stars', 'forks', 'stars_trending', 'since'])):
+    """A trending repository, stars and forks are ints or None when not shown"""
+
+    __slots__ = ()
+
+    @property
+    def full_name(self):
+        """Return the repository like "user/repository" """
+        return self.user + '/' + self.repository
+
+    @property
+    def key(self):
+        """Return what identifies the repository across snapshots"""
+        return self.full_name
+
+    @property
+    def stars_trending_text(self):
+        """Return stars trending as displayed by GitHub like "1,234 stars today" """
+        if self.stars_trending is None:
+            return ''
+        return format_count(self.stars_trending) + ' stars ' + self.since
+
+
+class TrendingDeveloper(namedtuple('TrendingDeveloper', [
+        'developer', 'profile', 'repository', 'url', 'description'])):
+    """A trending developer and the repository that made them trending"""
+
+    __slots__ = ()
+
+    @property
+    def login(self):
+        """Return the developer login without the full name"""
+        return self.developer.split(' (')[0]
+
+    @property
+    def full_name(self):
+        """Return the developer repository like "user/repository" """
+        return self.login + '/' + self.repository
+
+    @property
+    def key(self):
+        """Return what identifies the developer across snapshots"""
+        return self.login
@@ -16,11 +16,10 @@
 
 from __future__ import print_function
 
-from .github import Github
-
-
 def cli():
     """Creates and calls Github."""
+    # prompt_toolkit is only imported once the shell actually starts.
+    from .github import Github
     try:
         github = Github()
         github.run_cli()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import errno
+import io
+import os
+import platform
+import shlex
+import subprocess
+import sys
+from contextlib import contextmanager
+
+
+class Pager(object):
+    """Stream the output of in-process commands into a pager.
+
+    While paging, sys.stdout is the pager's stdin, so every line a command
+    echoes shows up in the pager as soon as it is written instead of once the
+    command is done.
+
+    :type PAGER_CMD: list (const)
+    :param PAGER_CMD: The pager, quitting at once if the output fits the
+        screen and keeping colors.
+
+    :type PAGER_CMD_WIN: list (const)
+    :param PAGER_CMD_WIN: The pager on Windows.
+    """
+
+    PAGER_CMD = ['less', '-FRX']
+    PAGER_CMD_WIN = ['more']
+
+    def get_pager_cmd(self):
+        """Get the pager command, $PAGER if set.
+
+        :rtype: list
+        :return: The pager command and its args.
+        """
+        pager = os.getenv('PAGER')
+        if pager:
+            return shlex.split(pager)
+        if platform.system() == 'Windows':
+            return self.PAGER_CMD_WIN
+        return self.PAGER_CMD
+
+    def create_stream(self, process):
+        """Create a text stream writing to the pager.
+
+        :type process: :class:`subprocess.Popen`
+        :param process: The pager process.
+
+        :rtype: file
+        :return: The pager's stdin, as a text stream on Python 3.
+        """
+        if sys.version_info[0] < 3:
+            return process.stdin
+        encoding = getattr(sys.stdout, 'encoding', None) or 'utf-8'
+        return io.TextIOWrapper(process.stdin, encoding=encoding,
+                                errors='replace', line_buffering=True)
+
+    @contextmanager
+    def page(self):
+        """Page everything written to sys.stdout within the context.
+
+        The output is written straight to the terminal if the pager cannot
+        be started, and quitting the pager early just drops the rest.
+        """
+        try:
+            process = subprocess.Popen(self.get_pager_cmd(),
+                                       stdin=subprocess.PIPE)
+        except OSError:
+            yield
+            return
+        stdout = sys.stdout
+        stream = self.create_stream(process)
+        sys.stdout = stream
+        try:
+            yield
+        except (IOError, OSError) as e:
+            if e.errno != errno.EPIPE:
+                raise
+        except KeyboardInterrupt:
+            # The pager handles ^C itself.
+            pass
+        finally:
+            sys.stdout = stdout
+            try:
+                stream.close()
+            except (IOError, OSError):
+                pass
+            while True:
+                try:
+                    process.wait()
+                    break
+                except KeyboardInterrupt:
+                    pass
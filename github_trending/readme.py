@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from .http_cache import HttpCache
+from .storage import file_lock, write_file_atomic
+
+
+class ReadmeLocator(object):
+    """Find the README of a repository on raw.githubusercontent.com.
+
+    Every README name on every candidate branch is probed concurrently and
+    the first one found wins. The winning branch and name are remembered
+    per repository, so viewing the same repository again costs one request.
+
+    :type session: :class:`session.HttpSession`
+    :param session: An instance of `session.HttpSession`.
+
+    :type memo_path: str
+    :param memo_path: The file the found README locations are stored in.
+
+    :type readme_url: str
+    :param readme_url: The README url template, $GITHUB_TRENDING_README_URL
+        or README_URL by default.
+    """
+
+    README_URL = 'https://raw.githubusercontent.com/{repository}/{branch}/{name}'
+    README_URL_ENV = 'GITHUB_TRENDING_README_URL'
+    README_NAMES = ['README.md', 'README.rst', 'README.txt', 'README']
+    BRANCHES = ['master', 'main']
+    MEMO_FILE = 'readme_locations.json'
+
+    def __init__(self, session, memo_path=None, readme_url=None):
+        self.session = session
+        self.readme_url = readme_url or os.getenv(self.README_URL_ENV) or self.README_URL
+        self.memo_path = memo_path or os.path.join(HttpCache.get_cache_dir(),
+                                                   self.MEMO_FILE)
+        self.memo = None
+        # The repositories whose remembered README is gone, removed from the
+        # memo on disk when it is saved.
+        self.removed = set()
+
+    def get_url(self, repository, branch, name):
+        """Get the raw url of a README.
+
+        :type repository: str
+        :param repository: The repository like "user/repository".
+
+        :type branch: str
+        :param branch: The branch name.
+
+        :type name: str
+        :param name: The README file name.
+
+        :rtype: str
+        :return: The raw README url.
+        """
+        return self.readme_url.format(repository=repository,
+                                      branch=branch,
+                                      name=name)
+
+    def fetch(self, url):
+        """Fetch the url without downloading the body yet.
+
+        :type url: str
+        :param url: The url to fetch.
+
+        :rtype: :class:`requests.Response`
+        :return: The response if the url exists, None otherwise.
+        """
+        try:
+            res = self.session.get(url, stream=True)
+        except requests.exceptions.RequestException:
+            return None
+        if res.status_code != 200:
+            # Release the unread connection back to the pool.
+            res.close()
+            return None
+        return res
+
+    def find(self, repository):
+        """Find the README of the given repository.
+
+        :type repository: str
+        :param repository: The repository like "user/repository".
+
+        :rtype: tuple
+        :return: The README (url, response), or (None, None) if not found.
+        """
+        memo = self.load_memo()
+        if repository in memo:
+            branch, name = memo[repository]
+            url = self.get_url(repository, branch, name)
+            res = self.fetch(url)
+            if res is not None:
+                return url, res
+            del memo[repository]
+            self.removed.add(repository)
+        candidates = [(branch, name)
+                      for branch in self.BRANCHES
+                      for name in self.README_NAMES]
+        location, url, res = self.probe(repository, candidates)
+        if location is not None:
+            memo[repository] = location
+            self.removed.discard(repository)
+        self.save_memo()
+        return url, res
+
+    def probe(self, repository, candidates):
+        """Request all candidates at once and keep the first one found.
+
+        Candidates not yet sent are cancelled and the responses of those
+        already in flight are closed as soon as they arrive.
+
+        :type repository: str
+        :param repository: The repository like "user/repository".
+
+        :type candidates: list
+        :param candidates: The (branch, name) pairs to try.
+
+        :rtype: tuple
+        :return: The winning ((branch, name), url, response), or Nones.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = {}
+        for branch, name in candidates:
+            url = self.get_url(repository, branch, name)
+            futures[executor.submit(self.fetch, url)] = ((branch, name), url)
+        winner = None
+        try:
+            for future in as_completed(futures):
+                if future.result() is not None:
+                    winner = future
+                    break
+        finally:
+            for future in futures:
+                if future is not winner and not future.cancel():
+                    future.add_done_callback(self._close_response)
+            executor.shutdown(wait=False)
+        if winner is None:
+            return None, None, None
+        location, url = futures[winner]
+        return location, url, winner.result()
+
+    def _close_response(self, future):
+        """Close the response of a losing candidate.
+
+        :type future: :class:`concurrent.futures.Future`
+        :param future: The future of the candidate.
+        """
+        if not future.cancelled() and future.result() is not None:
+            future.result().close()
+
+    def load_memo(self):
+        """Load the README locations found so far.
+
+        :rtype: dict
+        :return: The [branch, name] of each repository's README.
+        """
+        if self.memo is None:
+            self.memo = self.read_memo()
+        return self.memo
+
+    def read_memo(self):
+        """Read the README locations saved on disk.
+
+        :rtype: dict
+        :return: The [branch, name] of each repository's README.
+        """
+        try:
+            with io.open(self.memo_path, encoding='utf-8') as memo_file:
+                return json.load(memo_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def save_memo(self):
+        """Save the README locations found so far.
+
+        The locations other processes saved meanwhile are merged in, and the
+        ones found to be gone are removed.
+        """
+        try:
+            with file_lock(self.memo_path):
+                memo = self.read_memo()
+                memo.update(self.load_memo())
+                for repository in self.removed:
+                    memo.pop(repository, None)
+                self.memo = memo
+                write_file_atomic(self.memo_path, json.dumps(memo))
+                self.removed.clear()
+        except (IOError, OSError):
+            # The memo only saves requests, losing it is not an error.
+            pass
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import csv
+import json
+from collections import OrderedDict
+
+TEXT_FORMAT = 'text'
+OUTPUT_FORMATS = [TEXT_FORMAT, 'json', 'ndjson', 'csv', 'tsv']
+DELIMITERS = {
+    'csv': ',',
+    'tsv': '\t',
+}
+# The fields written before the fields of every record, so the rows of
+# several languages can be told apart.
+PAGE_FIELDS = ['language', 'period', 'rank']
+
+
+def iter_rows(records, language, period):
+    """Prefix the records of a trending page with where they come from.
+
+    :type records: iterable
+    :param records: The `TrendingRepository` or `TrendingDeveloper` records
+        of the page, read as the rows are.
+
+    :type language: str
+    :param language: The language of the page, None for all languages.
+
+    :type period: str
+    :param period: 'daily', 'weekly' or 'monthly'.
+
+    :rtype: iterator
+    :return: The values of PAGE_FIELDS followed by the record fields, the
+        rank starting at 1.
+    """
+    for rank, record in enumerate(records, 1):
+        yield (language, period, rank) + tuple(record)
+
+
+def row_to_dict(row, fields):
+    """Convert a row to a dict keeping the order of its fields.
+
+    :type row: tuple
+    :param row: The values of the fields.
+
+    :type fields: list
+    :param fields: The field names.
+
+    :rtype: :class:`collections.OrderedDict`
+    :return: The fields and their values.
+    """
+    return OrderedDict(zip(fields, row))
+
+
+def csv_value(value):
+    """Convert a field value to what the csv module writes.
+
+    :rtype: str
+    :return: '' for None, UTF-8 bytes for text on Python 2.
+    """
+    if value is None:
+        return ''
+    if str is bytes and isinstance(value, type(u'')):
+        return value.encode('utf-8')
+    return value
+
+
+def write_json(rows, fields, stream):
+    """Write the rows as a JSON array of objects.
+
+    :type rows: iterable
+    :param rows: The rows to write.
+
+    :type fields: list
+    :param fields: The field names.
+
+    :type stream: file
+    :param stream: The text stream to write to.
+    """
+    stream.write(json.dumps([row_to_dict(row, fields) for row in rows], indent=2))
+    stream.write('\n')
+
+
+def write_ndjson(rows, fields, stream):
+    """Write a JSON object per line and row.
+
+    Each line is flushed as soon as the row is read, so consumers can start
+    before the whole page is parsed.
+
+    :type rows: iterable
+    :param rows: The rows to write.
+
+    :type fields: list
+    :param fields: The field names.
+
+    :type stream: file
+    :param stream: The text stream to write to.
+    """
+    for row in rows:
+        stream.write(json.dumps(row_to_dict(row, fields)) + '\n')
+        stream.flush()
+
+
+def write_delimited(rows, fields, stream, delimiter):
+    """Write the rows after a header row.
+
+    :type rows: iterable
+    :param rows: The rows to write.
+
+    :type fields: list
+    :param fields: The field names, written as the header.
+
+    :type stream: file
+    :param stream: The text stream to write to.
+
+    :type delimiter: str
+    :param delimiter: The field delimiter.
+    """
+    writer = csv.writer(stream, delimiter=str(delimiter), lineterminator='\n')
+    writer.writerow([csv_value(field) for field in fields])
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+
+
+def write_records(rows, fields, output_format, stream):
+    """Write the rows in the given machine readable format.
+
+    :type rows: iterable
+    :param rows: The rows made by `iter_rows`, read as they are written for
+        every format but json.
+
+    :type fields: list
+    :param fields: The field names of the rows.
+
+    :type output_format: str
+    :param output_format: One of json, ndjson, csv or tsv.
+
+    :type stream: file
+    :param stream: The text stream to write to.
+    """
+    if output_format == 'json':
+        write_json(rows, fields, stream)
+    elif output_format == 'ndjson':
+        write_ndjson(rows, fields, stream)
+    elif output_format in DELIMITERS:
+        write_delimited(rows, fields, stream, DELIMITERS[output_format])
+    else:
+        raise ValueError('Unknown output format: ' + output_format)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+
+from .config import Config
+from .http_cache import HttpCache
+from .storage import file_lock, make_parent_dir, write_file_atomic
+
+
+class RepositoryCache(object):
+    """Append-only LRU cache of the repositories shown, used by `view` completions.
+
+    The log starts with a JSON header line holding the format version, each
+    following line is a JSON ["user/repository", "description", last_seen]
+    entry, last_seen in seconds since the epoch, later lines overriding
+    earlier ones. Saving only appends the entries seen since the last save,
+    and the log is rewritten with just the live entries once it has grown to
+    COMPACT_RATIO times their number.
+
+    Entries are kept least recently seen first, so once there are more than
+    `max_size` the oldest are evicted from the front in O(1) each.
+
+    Saving holds an advisory lock on the log and first merges what other
+    processes saved, so concurrent `gt` runs do not lose each other's entries.
+
+    :type path: str
+    :param path: The log file path.
+
+    :type max_size: int
+    :param max_size: The maximum number of entries kept.
+
+    :type VERSION: int (const)
+    :param VERSION: The log format version, logs of other versions are
+        rewritten on the next save.
+    """
+
+    CACHE_FILE = 'repositories.jsonl'
+    FORMAT = 'github-trending-repositories'
+    VERSION = 2
+    COMPACT_RATIO = 2
+    COMPACT_MIN_LINES = 1000
+    MAX_ITEM_CACHE_SIZE = 20000
+
+    def __init__(self, path=None, max_size=MAX_ITEM_CACHE_SIZE):
+        self.path = path or os.path.join(HttpCache.get_cache_dir(),
+                                         self.CACHE_FILE)
+        self.max_size = max_size
+        self.repositories = OrderedDict()
+        self.last_seen = {}
+        self.pending = OrderedDict()
+        self.lines = 0
+        self.compatible = False
+        self.loaded = False
+        self.inode = None
+        self.offset = 0
+
+    def header(self):
+        """Encode the header line of the log.
+
+        :rtype: str
+        :return: The JSON line, newline terminated.
+        """
+        line = json.dumps({'format': self.FORMAT, 'version': self.VERSION})
+        if not isinstance(line, type(u'')):
+            line = line.decode('utf-8')
+        return line + u'\n'
+
+    def encode(self, user_repository, description, last_seen):
+        """Encode an entry as a line of the log.
+
+        :rtype: str
+        :return: The JSON line, newline terminated.
+        """
+        line = json.dumps([user_repository, description, last_seen])
+        if not isinstance(line, type(u'')):
+            line = line.decode('utf-8')
+        return line + u'\n'
+
+    def load(self):
+        """Load the log, migrating the cache of ~/.githubtrendingconfig first.
+
+        :rtype: :class:`collections.OrderedDict`
+        :return: The descriptions keyed by "user/repository", least recently
+            seen first.
+        """
+        self.repositories = OrderedDict()
+        self.last_seen = {}
+        self.lines = 0
+        self.compatible = False
+        self.loaded = True
+        self.inode = None
+        self.offset = 0
+        try:
+            with io.open(self.path, 'rb') as cache_file:
+                data = cache_file.read()
+                self.inode = os.fstat(cache_file.fileno()).st_ino
+        except (IOError, OSError):
+            # There might not be a cache yet.
+            if not os.path.exists(self.path):
+                self.migrate()
+            return self.repositories
+        # Drop a line cut short by an interrupted append, the next save
+        # rewrites the log so nothing is appended after it.
+        end = data.rfind(b'\n') + 1
+        header, _, body = data[:end].decode('utf-8').partition(u'\n')
+        try:
+            self.compatible = json.loads(header) == json.loads(self.header())
+        except ValueError:
+            pass
+        if not self.compatible:
+            return self.repositories
+        self.compatible = end == len(data)
+        self.offset = end
+        entries = self.parse(body)
+        self.last_seen = dict((entry[0], entry[2]) for entry in entries)
+        if len(self.last_seen) == len(entries):
+            # A compacted log has no entry seen twice, keep its order as is.
+            self.repositories = OrderedDict((entry[0], entry[1]) for entry in entries)
+        else:
+            for user_repository, description, last_seen in entries:
+                self.touch(user_repository, description, last_seen)
+        self.lines = len(entries)
+        self.evict()
+        return self.repositories
+
+    def parse(self, body):
+        """Parse the entry lines of the log.
+
+        The lines are joined into a single JSON array so the whole log is
+        decoded by one `json.loads` call.
+
+        :type body: str
+        :param body: The newline terminated entry lines.
+
+        :rtype: list
+        :return: The ("user/repository", description, last_seen) entries in
+            log order.
+        """
+        if not body:
+            return []
+        try:
+            return json.loads(u'[' + body[:-1].replace(u'\n', u',') + u']')
+        except ValueError:
+            pass
+        entries = []
+        for line in body.splitlines():
+            try:
+                user_repository, description, last_seen = json.loads(line)
+            except (ValueError, TypeError):
+                continue
+            entries.append((user_repository, description, last_seen))
+        return entries
+
+    def refresh(self):
+        """Apply the entries appended to the log since it was last read.
+
+        The log is only appended to or atomically replaced, so an unchanged
+        inode and a larger size mean only the new lines have to be parsed.
+
+        :rtype: :class:`collections.OrderedDict`
+        :return: The entries added or refreshed, or None if the cache changed
+            as a whole and has to be rebuilt from `repositories`.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            stat = None
+        if not self.loaded or stat is None or stat.st_ino != self.inode or \
+                stat.st_size < self.offset or not self.compatible:
+            if stat is None and self.loaded and self.inode is None:
+                return OrderedDict()
+            self.load()
+            return None
+        changes = OrderedDict()
+        if stat.st_size == self.offset:
+            return changes
+        try:
+            with io.open(self.path, 'rb') as cache_file:
+                cache_file.seek(self.offset)
+                data = cache_file.read()
+        except (IOError, OSError):
+            return changes
+        # Leave a line still being written for the next refresh.
+        end = data.rfind(b'\n') + 1
+        entries = self.parse(data[:end].decode('utf-8'))
+        self.offset += end
+        self.lines += len(entries)
+        for user_repository, description, last_seen in entries:
+            self.touch(user_repository, description, last_seen)
+            changes[user_repository] = description
+        if len(self.repositories) > self.max_size:
+            self.evict()
+            return None
+        return changes
+
+    def migrate(self):
+        """Move the cache older versions kept in ~/.githubtrendingconfig."""
+        config = Config()
+        config.load_config([config.load_config_repositories])
+        if not config.repositories:
+            return
+        self.update(config.repositories)
+        self.save()
+        # Rewrite the config without the repositories.
+        config.save_cache()
+
+    def touch(self, user_repository, description, last_seen):
+        """Set an entry and move it to the most recently seen end."""
+        self.repositories.pop(user_repository, None)
+        self.repositories[user_repository] = description
+        self.last_seen[user_repository] = last_seen
+
+    def evict(self):
+        """Drop the least recently seen entries beyond max_size."""
+        while len(self.repositories) > self.max_size:
+            user_repository, _ = self.repositories.popitem(last=False)
+            del self.last_seen[user_repository]
+            self.pending.pop(user_repository, None)
+
+    def update(self, repositories):
+        """Add or refresh entries as seen now, to be saved.
+
+        :type repositories: dict
+        :param repositories: The descriptions keyed by "user/repository".
+        """
+        last_seen = int(time.time())
+        for user_repository, description in repositories.items():
+            self.touch(user_repository, description, last_seen)
+            self.pending.pop(user_repository, None)
+            self.pending[user_repository] = (description, last_seen)
+        self.evict()
+
+    def save(self):
+        """Append the pending entries, compacting the log when needed.
+
+        The log is locked while the entries other processes saved since the
+        last read are merged and the pending ones are written.
+        """
+        if not self.pending:
+            return
+        try:
+            with file_lock(self.path):
+                self.refresh()
+                # Apply the pending entries again in case the log was reloaded.
+                for user_repository, (description, last_seen) in self.pending.items():
+                    self.touch(user_repository, description, last_seen)
+                self.evict()
+                if not self.compatible or self.lines + len(self.pending) > max(
+                        self.COMPACT_MIN_LINES,
+                        self.COMPACT_RATIO * len(self.repositories)):
+                    self.compact()
+                else:
+                    self.append()
+        except (IOError, OSError):
+            # Only the completions of `gt view` for these repositories are
+            # lost, the listing was already shown.
+            pass
+        self.pending = OrderedDict()
+
+    def append(self):
+        """Write the pending entries at the end of the log."""
+        make_parent_dir(self.path)
+        data = u''.join(self.encode(user_repository, description, last_seen)
+                        for user_repository, (description, last_seen)
+                        in self.pending.items())
+        data = data.encode('utf-8')
+        with io.open(self.path, 'ab') as cache_file:
+            cache_file.seek(0, os.SEEK_END)
+            if cache_file.tell() == self.offset:
+                # Nothing was appended by others, skip our own lines on refresh.
+                self.offset += len(data)
+            cache_file.write(data)
+        self.lines += len(self.pending)
+
+    def compact(self):
+        """Rewrite the log with one line per live entry."""
+        data = self.header() + u''.join(
+            self.encode(user_repository, description,
+                        self.last_seen[user_repository])
+            for user_repository, description in self.repositories.items())
+        data = data.encode('utf-8')
+        self.inode = write_file_atomic(self.path, data)
+        self.lines = len(self.repositories)
+        self.compatible = True
+        self.offset = len(data)
+
+    def clear(self):
+        """Clear the repository cache."""
+        self.repositories = OrderedDict()
+        self.last_seen = {}
+        self.pending = OrderedDict()
+        try:
+            with file_lock(self.path):
+                self.compact()
+        except (IOError, OSError):
+            # The log is left as it was, the repositories come back on the
+            # next load.
+            pass
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import random
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+import requests
+from requests.adapters import HTTPAdapter
+try:
+    from requests.packages.urllib3.util.retry import Retry
+except ImportError:
+    from urllib3.util.retry import Retry
+
+from .__init__ import __version__
+
+
+class RateLimiter(object):
+    """Thread safe token bucket limiting the rate of requests.
+
+    :type rate: float
+    :param rate: The number of requests allowed per second on average.
+
+    :type burst: int
+    :param burst: The number of requests allowed at once after being idle.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request is allowed.
+
+        :rtype: float
+        :return: The number of seconds spent waiting.
+        """
+        waited = 0
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                # Sleeping under the lock queues the other threads behind us.
+                time.sleep(waited)
+                self.updated_at = time.time()
+                self.tokens = 1
+            self.tokens -= 1
+        return waited
+
+
+class HttpSession(object):
+    """Pooled keep-alive HTTP session shared by every Github Trending fetch.
+
+    The trending scraper and the README viewer both go through one
+    :class:`requests.Session`, so consecutive requests to github.com and
+    raw.githubusercontent.com reuse open connections instead of paying for
+    a new TCP and TLS handshake each time.
+
+    :type pool_connections: int
+    :param pool_connections: The number of per-host connection pools to keep.
+
+    :type pool_maxsize: int
+    :param pool_maxsize: The maximum number of connections kept per host.
+
+    :type pool_block: bool
+    :param pool_block: Determines whether to wait for a free connection
+        instead of opening more than `pool_maxsize` connections to a host.
+
+    :type timeout: tuple
+    :param timeout: The (connect, read) timeouts in seconds.
+
+    :type max_retries: int
+    :param max_retries: The number of retries for failed connections, server
+        errors and requests throttled by GitHub.
+
+    :type backoff_factor: float
+    :param backoff_factor: The exponential backoff factor between retries.
+
+    :type rate: float
+    :param rate: The number of requests per second allowed on average, None
+        to disable rate limiting.
+
+    :type burst: int
+    :param burst: The number of requests allowed at once after being idle.
+
+    :type stats: dict
+    :param stats: The number of requests sent, throttled by GitHub, retried
+        and failed.
+    """
+
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 10
+    POOL_BLOCK = False
+    CONNECT_TIMEOUT = 5
+    READ_TIMEOUT = 30
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.3
+    MAX_BACKOFF = 60
+    RETRY_STATUSES = (500, 502, 504)
+    THROTTLE_STATUSES = (429, 503)
+    RATE = 5
+    BURST = 10
+    USER_AGENT = 'github-trending-cli/' + __version__
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                 rate=RATE, burst=BURST):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = RateLimiter(rate, burst) if rate else None
+        self.stats = {'requests': 0, 'throttled': 0, 'retried': 0, 'failed': 0}
+        self.stats_lock = threading.Lock()
+        self.session = self._create_session()
+
+    def _create_retry(self):
+        """Create the retry policy for the connection pools.
+
+        Throttled requests are left to `get`, which keeps count of them.
+
+        :rtype: :class:`urllib3.util.retry.Retry`
+        :return: An instance of `urllib3.util.retry.Retry`.
+        """
+        return Retry(total=self.max_retries,
+                     backoff_factor=self.backoff_factor,
+                     status_forcelist=self.RETRY_STATUSES,
+                     respect_retry_after_header=False,
+                     raise_on_status=False)
+
+    def _create_session(self):
+        """Create the underlying session with pooled adapters mounted.
+
+        :rtype: :class:`requests.Session`
+        :return: An instance of `requests.Session`.
+        """
+        session = requests.Session()
+        session.headers['User-Agent'] = self.USER_AGENT
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block,
+                              max_retries=self._create_retry())
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _count(self, stat):
+        """Increment the given request counter.
+
+        :type stat: str
+        :param stat: The counter to increment.
+        """
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def get_backoff(self, res, attempt):
+        """Get the number of seconds to wait before retrying a request.
+
+        A `Retry-After` header sent by GitHub is honoured, otherwise the
+        delay grows exponentially. Both are jittered so that concurrent
+        requests throttled together do not retry together.
+
+        :type res: :class:`requests.Response`
+        :param res: The throttled response.
+
+        :type attempt: int
+        :param attempt: The number of retries done so far.
+
+        :rtype: float
+        :return: The number of seconds to wait.
+        """
+        retry_after = res.headers.get('Retry-After')
+        delay = None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                date = parsedate_tz(retry_after)
+                if date is not None:
+                    delay = mktime_tz(date) - time.time()
+        if delay is None:
+            delay = random.uniform(0, self.backoff_factor * (2 ** (attempt + 1)))
+        else:
+            delay = max(delay, 0) + random.uniform(0, self.backoff_factor)
+        return min(delay, self.MAX_BACKOFF)
+
+    def get(self, url, **kwargs):
+        """Send a GET request over a pooled connection.
+
+        Requests are rate limited, and retried with backoff while GitHub
+        throttles them. The last response is returned once the retries are
+        exhausted, so callers decide how to report the failure.
+
+        :type url: str
+        :param url: The url to fetch.
+
+        :type kwargs: dict
+        :param kwargs: Extra arguments passed to `requests.Session.get`.
+
+        :rtype: :class:`requests.Response`
+        :return: An instance of `requests.Response`.
+        :raises: :class:`requests.exceptions.RequestException` if the
+            connection could not be established.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self._count('requests')
+            try:
+                res = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._count('failed')
+                raise
+            if res.status_code not in self.THROTTLE_STATUSES:
+                return res
+            self._count('throttled')
+            if attempt >= self.max_retries:
+                self._count('failed')
+                return res
+            delay = self.get_backoff(res, attempt)
+            res.close()
+            self._count('retried')
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
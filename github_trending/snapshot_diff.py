@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+from collections import namedtuple
+
+
+class RankChange(namedtuple('RankChange', [
+        'item', 'old_rank', 'new_rank', 'stars_trending_delta'])):
+    """An item of a snapshot diff.
+
+    :type item: :class:`records.TrendingRepository`
+    :param item: The item as in the newer snapshot, or the older one if it
+        dropped out.
+
+    :type old_rank: int
+    :param old_rank: The rank in the older snapshot, None for new entrants.
+
+    :type new_rank: int
+    :param new_rank: The rank in the newer snapshot, None for dropouts.
+
+    :type stars_trending_delta: int
+    :param stars_trending_delta: The change of stars trending, None if
+        unknown.
+    """
+
+    __slots__ = ()
+
+    @property
+    def rank_delta(self):
+        """Get how many ranks the item moved up, negative if it moved down.
+
+        :rtype: int
+        :return: The rank delta.
+        """
+        return self.old_rank - self.new_rank
+
+
+class SnapshotDiff(object):
+    """The differences between two snapshots of a trending page.
+
+    :type new: list
+    :param new: The `RankChange` of the new entrants, by new rank.
+
+    :type dropped: list
+    :param dropped: The `RankChange` of the dropouts, by old rank.
+
+    :type moved: list
+    :param moved: The `RankChange` of the items whose rank changed, by new
+        rank.
+
+    :type unchanged: list
+    :param unchanged: The `RankChange` of the items that kept their rank.
+    """
+
+    def __init__(self, new, dropped, moved, unchanged):
+        self.new = new
+        self.dropped = dropped
+        self.moved = moved
+        self.unchanged = unchanged
+
+    def has_changes(self):
+        """Determine if the snapshots differ.
+
+        :rtype: bool
+        :return: Specifies whether any item is new, dropped or moved.
+        """
+        return bool(self.new or self.dropped or self.moved)
+
+
+def get_stars_trending_delta(old_item, new_item):
+    """Get the change of stars trending between two snapshots of an item.
+
+    :type old_item: :class:`records.TrendingRepository`
+    :param old_item: The item in the older snapshot.
+
+    :type new_item: :class:`records.TrendingRepository`
+    :param new_item: The item in the newer snapshot.
+
+    :rtype: int
+    :return: The delta, None for developers or missing counts.
+    """
+    old_stars = getattr(old_item, 'stars_trending', None)
+    new_stars = getattr(new_item, 'stars_trending', None)
+    if old_stars is None or new_stars is None:
+        return None
+    return new_stars - old_stars
+
+
+def diff_snapshots(old_items, new_items):
+    """Compare two snapshots of the same trending page.
+
+    Both lists are indexed once by their record key, "user/repository" for
+    repositories and the login for developers, so the diff is linear
+    in the number of items. Only the top ranks present in both snapshots are
+    compared, so a snapshot fetched with a smaller limit does not report the
+    rest of the page as new.
+
+    :type old_items: list
+    :param old_items: The older `TrendingRepository` or `TrendingDeveloper`.
+
+    :type new_items: list
+    :param new_items: The newer `TrendingRepository` or `TrendingDeveloper`.
+
+    :rtype: :class:`SnapshotDiff`
+    :return: An instance of `SnapshotDiff`.
+    """
+    size = min(len(old_items), len(new_items))
+    old_ranks = dict((item.key, (rank, item))
+                     for rank, item in enumerate(old_items[:size], start=1))
+    new, moved, unchanged = [], [], []
+    for rank, item in enumerate(new_items[:size], start=1):
+        old = old_ranks.pop(item.key, None)
+        if old is None:
+            new.append(RankChange(item, None, rank, None))
+            continue
+        old_rank, old_item = old
+        change = RankChange(item, old_rank, rank,
+                            get_stars_trending_delta(old_item, item))
+        if old_rank == rank:
+            unchanged.append(change)
+        else:
+            moved.append(change)
+    dropped = sorted((RankChange(item, rank, None, None)
+                      for rank, item in old_ranks.values()),
+                     key=lambda change: change.old_rank)
+    return SnapshotDiff(new, dropped, moved, unchanged)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import os
+import threading
+import time
+
+from .lib.github.records import TrendingDeveloper, TrendingRepository
+
+
+def get_period(weekly, monthly):
+    """Get the trending period name of the duration flags.
+
+    :type weekly: bool
+    :param weekly: Determines whether the trending is weekly.
+
+    :type monthly: bool
+    :param monthly: Determines whether the trending is monthly.
+
+    :rtype: str
+    :return: 'daily', 'weekly' or 'monthly'.
+    """
+    if weekly:
+        return 'weekly'
+    if monthly:
+        return 'monthly'
+    return 'daily'
+
+
+class SnapshotStore(object):
+    """SQLite time series of the trending pages fetched.
+
+    Every page is stored as a snapshot keyed by (taken_at, language, period,
+    kind) with its ranked items in a table per kind.
+
+    :type path: str
+    :param path: The database file path.
+    """
+
+    DATA_DIR = 'github-trending'
+    DATABASE = 'snapshots.sqlite3'
+    REPOSITORIES = 'repositories'
+    DEVELOPERS = 'developers'
+    SECONDS_PER_DAY = 24 * 60 * 60
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY,
+            taken_at REAL NOT NULL,
+            language TEXT NOT NULL,
+            period TEXT NOT NULL,
+            kind TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS snapshots_key
+            ON snapshots (language, period, kind, taken_at);
+        CREATE INDEX IF NOT EXISTS snapshots_taken_at
+            ON snapshots (taken_at);
+        CREATE TABLE IF NOT EXISTS repositories (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+            rank INTEGER NOT NULL,
+            user TEXT NOT NULL,
+            repository TEXT NOT NULL,
+            url TEXT NOT NULL,
+            description TEXT NOT NULL,
+            programming_language TEXT NOT NULL,
+            stars INTEGER,
+            forks INTEGER,
+            stars_trending INTEGER,
+            since TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, rank)
+        );
+        CREATE INDEX IF NOT EXISTS repositories_name
+            ON repositories (user, repository, snapshot_id);
+        CREATE TABLE IF NOT EXISTS developers (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+            rank INTEGER NOT NULL,
+            developer TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            repository TEXT NOT NULL,
+            url TEXT NOT NULL,
+            description TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, rank)
+        );
+        CREATE INDEX IF NOT EXISTS developers_name
+            ON developers (developer, snapshot_id);
+    '''
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(self.get_data_dir(), self.DATABASE)
+        self.connection = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_data_dir(cls):
+        """Get the github-trending directory in the user's data dir.
+
+        :rtype: str
+        :return: The data dir path, $XDG_DATA_HOME or ~/.local/share based.
+        """
+        data_home = os.getenv('XDG_DATA_HOME')
+        if not data_home:
+            home = os.path.abspath(os.getenv('HOME', ''))
+            data_home = os.path.join(home, '.local', 'share')
+        return os.path.join(data_home, cls.DATA_DIR)
+
+    def connect(self):
+        """Open the database and create the schema on first use.
+
+        :rtype: :class:`sqlite3.Connection`
+        :return: An instance of `sqlite3.Connection`.
+        """
+        if self.connection is None:
+            import sqlite3
+            data_dir = os.path.dirname(self.path)
+            if data_dir and not os.path.isdir(data_dir):
+                os.makedirs(data_dir)
+            # Batch fetches save from worker threads, self.lock serializes them.
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.executescript(self.SCHEMA)
+        return self.connection
+
+    def close(self):
+        """Close the database."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def save(self, items, language, period, dev, taken_at=None):
+        """Store a trending page as a new snapshot.
+
+        All items are inserted at once in a single transaction.
+
+        :type items: list
+        :param items: The `TrendingRepository` or `TrendingDeveloper` items.
+
+        :type language: str
+        :param language: The trending language, None for all languages.
+
+        :type period: str
+        :param period: 'daily', 'weekly' or 'monthly'.
+
+        :type dev: bool
+        :param dev: Determines whether the items are developers.
+
+        :type taken_at: float
+        :param taken_at: When the page was fetched, defaults to now.
+
+        :rtype: int
+        :return: The snapshot id.
+        """
+        kind = self.DEVELOPERS if dev else self.REPOSITORIES
+        fields = (TrendingDeveloper if dev else TrendingRepository)._fields
+        insert = 'INSERT INTO {0} (snapshot_id, rank, {1}) VALUES (?, ?, {2})'.format(
+            kind, ', '.join(fields), ', '.join('?' * len(fields)))
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                cursor = connection.execute(
+                    'INSERT INTO snapshots (taken_at, language, period, kind) '
+                    'VALUES (?, ?, ?, ?)',
+                    (taken_at or time.time(), (language or '').lower(), period, kind))
+                snapshot_id = cursor.lastrowid
+                connection.executemany(
+                    insert,
+                    ((snapshot_id, rank) + tuple(item)
+                     for rank, item in enumerate(items, start=1)))
+        return snapshot_id
+
+    def get_latest(self, language, period, dev, before=None):
+        """Load the latest snapshot of a trending page.
+
+        :type language: str
+        :param language: The trending language, None for all languages.
+
+        :type period: str
+        :param period: 'daily', 'weekly' or 'monthly'.
+
+        :type dev: bool
+        :param dev: Determines whether to load developers.
+
+        :type before: float
+        :param before: Only consider snapshots taken before this time.
+
+        :rtype: tuple
+        :return: The snapshot (taken_at, items), or (None, None) if there is
+            no snapshot yet.
+        """
+        kind = self.DEVELOPERS if dev else self.REPOSITORIES
+        record = TrendingDeveloper if dev else TrendingRepository
+        with self.lock:
+            connection = self.connect()
+            row = connection.execute(
+                'SELECT id, taken_at FROM snapshots '
+                'WHERE language = ? AND period = ? AND kind = ? AND taken_at < ? '
+                'ORDER BY taken_at DESC LIMIT 1',
+                ((language or '').lower(), period, kind,
+                 before if before is not None else float('inf'))).fetchone()
+            if row is None:
+                return None, None
+            snapshot_id, taken_at = row
+            rows = connection.execute(
+                'SELECT {0} FROM {1} WHERE snapshot_id = ? ORDER BY rank'.format(
+                    ', '.join(record._fields), kind),
+                (snapshot_id,)).fetchall()
+        return taken_at, [record(*row) for row in rows]
+
+    def get_star_history(self, full_name, days=30):
+        """Get the total stars of a repository each time it was trending.
+
+        :type full_name: str
+        :param full_name: The repository like "user/repository".
+
+        :type days: int
+        :param days: How many days back to look.
+
+        :rtype: list
+        :return: The (taken_at, stars) points, oldest first.
+        """
+        user, _, repository = full_name.partition('/')
+        with self.lock:
+            return self.connect().execute(
+                'SELECT s.taken_at, MAX(r.stars) FROM repositories r '
+                'JOIN snapshots s ON s.id = r.snapshot_id '
+                'WHERE r.user = ? AND r.repository = ? AND s.taken_at >= ? '
+                'AND r.stars IS NOT NULL '
+                'GROUP BY s.taken_at ORDER BY s.taken_at',
+                (user, repository,
+                 time.time() - days * self.SECONDS_PER_DAY)).fetchall()
+
+    def get_star_velocity(self, full_name, days=30):
+        """Get how many stars a day a repository gained while trending.
+
+        :type full_name: str
+        :param full_name: The repository like "user/repository".
+
+        :type days: int
+        :param days: How many days back to look.
+
+        :rtype: float
+        :return: The stars gained per day, None with fewer than two points.
+        """
+        history = self.get_star_history(full_name, days)
+        if len(history) < 2 or history[-1][0] == history[0][0]:
+            return None
+        elapsed_days = (history[-1][0] - history[0][0]) / self.SECONDS_PER_DAY
+        return (history[-1][1] - history[0][1]) / elapsed_days
+
+    def get_multi_language_repositories(self, min_languages=3, days=7):
+        """Get the repositories trending in several languages lately.
+
+        :type min_languages: int
+        :param min_languages: The minimum number of languages.
+
+        :type days: int
+        :param days: How many days back to look.
+
+        :rtype: list
+        :return: The ("user/repository", languages count) pairs, most
+            languages first.
+        """
+        with self.lock:
+            return self.connect().execute(
+                "SELECT r.user || '/' || r.repository, COUNT(DISTINCT s.language) AS languages "
+                'FROM snapshots s JOIN repositories r ON r.snapshot_id = s.id '
+                "WHERE s.taken_at >= ? AND s.kind = ? AND s.language != '' "
+                'GROUP BY r.user, r.repository HAVING languages >= ? '
+                'ORDER BY languages DESC, r.user, r.repository',
+                (time.time() - days * self.SECONDS_PER_DAY, self.REPOSITORIES,
+                 min_languages)).fetchall()
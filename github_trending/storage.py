@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import io
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from .compat import replace_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+LOCK_SUFFIX = '.lock'
+
+# The umask can only be read by setting it, so it is read once on import,
+# before any threads that could create files in between.
+_umask = os.umask(0)
+os.umask(_umask)
+# The mode of new files, as `open` would create them.
+NEW_FILE_MODE = 0o666 & ~_umask
+
+_held_locks = threading.local()
+
+
+def make_parent_dir(path):
+    """Create the directory of the given file path if it does not exist.
+
+    :type path: str
+    :param path: The file path.
+    """
+    parent_dir = os.path.dirname(path)
+    if parent_dir and not os.path.isdir(parent_dir):
+        try:
+            os.makedirs(parent_dir)
+        except OSError:
+            # Another process might have created it meanwhile.
+            if not os.path.isdir(parent_dir):
+                raise
+
+
+def get_lock_path(path, lock_dir=None):
+    """Get the path of the lock file for the given file.
+
+    :type path: str
+    :param path: The path of the file to lock.
+
+    :type lock_dir: str
+    :param lock_dir: The directory to keep the lock file in, the file's own
+        directory by default.
+
+    :rtype: str
+    :return: The lock file path.
+    """
+    if lock_dir is None:
+        return path + LOCK_SUFFIX
+    return os.path.join(lock_dir, os.path.basename(path) + LOCK_SUFFIX)
+
+
+@contextmanager
+def file_lock(path, lock_dir=None):
+    """Hold an exclusive advisory lock for the given file.
+
+    The lock is taken on a separate `.lock` file so it survives the file
+    being replaced. It is reentrant within a thread, and a no-op on
+    platforms without `fcntl` or `msvcrt`.
+
+    :type path: str
+    :param path: The path of the file to lock.
+
+    :type lock_dir: str
+    :param lock_dir: The directory to keep the lock file in, so files the
+        user edits, like the config, do not get one next to them. The
+        file's own directory by default.
+    """
+    held = getattr(_held_locks, 'paths', None)
+    if held is None:
+        held = _held_locks.paths = set()
+    if path in held:
+        yield
+        return
+    lock_path = get_lock_path(path, lock_dir)
+    make_parent_dir(lock_path)
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_file_atomic(path, data):
+    """Replace the given file with data in one step.
+
+    The data is written to a temporary file in the same directory which is
+    then renamed over the file, so readers see either the old or the new
+    content, never a partial write. A symlink is followed so the file it
+    points to is replaced instead of the link, and the file keeps its mode.
+
+    :type path: str
+    :param path: The path of the file to write.
+
+    :type data: str
+    :param data: The text or bytes to write, text is encoded as UTF-8.
+
+    :rtype: int
+    :return: The inode of the new file.
+    """
+    path = os.path.realpath(path)
+    make_parent_dir(path)
+    if isinstance(data, type(u'')):
+        data = data.encode('utf-8')
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = NEW_FILE_MODE
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or None,
+                                     prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp')
+    try:
+        with io.open(fd, 'wb') as temp_file:
+            temp_file.write(data)
+            inode = os.fstat(temp_file.fileno()).st_ino
+        os.chmod(temp_path, mode)
+        replace_file(temp_path, path)
+    except (IOError, OSError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return inode
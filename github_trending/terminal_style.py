@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+from __future__ import print_function
+from __future__ import division
+
+import sys
+
+import click
+from click.globals import resolve_color_default
+
+RESET = '\x1b[0m'
+
+
+def use_color():
+    """Check if the output is colored, the way `click.echo` decides it.
+
+    :rtype: bool
+    :return: The color set on the click context, else True if stdout is a
+        terminal.
+    """
+    color = resolve_color_default()
+    if color is not None:
+        return color
+    isatty = getattr(sys.stdout, 'isatty', None)
+    return bool(isatty and isatty())
+
+
+class Style(object):
+    """Style texts like `click.style`, building each ANSI prefix once.
+
+    The prefixes are kept by color and boldness, so a changed color in the
+    config gets a prefix of its own instead of a stale one.
+
+    :type color: bool
+    :param color: Whether texts are styled, when False they are returned as
+        they are.
+    """
+
+    def __init__(self, color=True):
+        self.color = color
+        self.prefixes = {}
+
+    def __call__(self, text, fg=None, bold=None):
+        """Style the given text.
+
+        :type text: str
+        :param text: The text to style.
+
+        :type fg: str
+        :param fg: The foreground color.
+
+        :type bold: bool
+        :param bold: Whether the text is bold.
+
+        :rtype: str
+        :return: The styled text.
+        """
+        if not self.color:
+            return text
+        key = (fg, bold)
+        prefix = self.prefixes.get(key)
+        if prefix is None:
+            prefix = self.prefixes[key] = click.style('', fg=fg, bold=bold, reset=False)
+        return prefix + text + RESET
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 Yuya Chiba. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+
+"""Display widths of text in the terminal.
+
+Fullwidth, wide and ambiguous East Asian characters take two columns, every
+other character one. Instead of asking `unicodedata` character by character,
+widths are looked up in WIDE_RANGES, the ranges of two column code points
+generated from the Unicode data of UNICODE_VERSION. ANSI escapes take no
+columns. Regenerate both with:
+
+    $ python -m github_trending.text_width
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import re
+from bisect import bisect_right
+
+UNICODE_VERSION = '14.0.0'
+
+# The inclusive (first, last) code point ranges whose East Asian width is F,
+# W or A.
+WIDE_RANGES = (
+    (0x00a1, 0x00a1), (0x00a4, 0x00a4), (0x00a7, 0x00a8), (0x00aa, 0x00aa),
+    (0x00ad, 0x00ae), (0x00b0, 0x00b4), (0x00b6, 0x00ba), (0x00bc, 0x00bf),
+    (0x00c6, 0x00c6), (0x00d0, 0x00d0), (0x00d7, 0x00d8), (0x00de, 0x00e1),
+    (0x00e6, 0x00e6), (0x00e8, 0x00ea), (0x00ec, 0x00ed), (0x00f0, 0x00f0),
+    (0x00f2, 0x00f3), (0x00f7, 0x00fa), (0x00fc, 0x00fc), (0x00fe, 0x00fe),
+    (0x0101, 0x0101), (0x0111, 0x0111), (0x0113, 0x0113), (0x011b, 0x011b),
+    (0x0126, 0x0127), (0x012b, 0x012b), (0x0131, 0x0133), (0x0138, 0x0138),
+    (0x013f, 0x0142), (0x0144, 0x0144), (0x0148, 0x014b), (0x014d, 0x014d),
+    (0x0152, 0x0153), (0x0166, 0x0167), (0x016b, 0x016b), (0x01ce, 0x01ce),
+    (0x01d0, 0x01d0), (0x01d2, 0x01d2), (0x01d4, 0x01d4), (0x01d6, 0x01d6),
+    (0x01d8, 0x01d8), (0x01da, 0x01da), (0x01dc, 0x01dc), (0x0251, 0x0251),
+    (0x0261, 0x0261), (0x02c4, 0x02c4), (0x02c7, 0x02c7), (0x02c9, 0x02cb),
+    (0x02cd, 0x02cd), (0x02d0, 0x02d0), (0x02d8, 0x02db), (0x02dd, 0x02dd),
+    (0x02df, 0x02df), (0x0300, 0x036f), (0x0378, 0x0379), (0x0380, 0x0383),
+    (0x038b, 0x038b), (0x038d, 0x038d), (0x0391, 0x03a9), (0x03b1, 0x03c1),
+    (0x03c3, 0x03c9), (0x0401, 0x0401), (0x0410, 0x044f), (0x0451, 0x0451),
+    (0x0530, 0x0530), (0x0557, 0x0558), (0x058b, 0x058c), (0x0590, 0x0590),
+    (0x05c8, 0x05cf), (0x05eb, 0x05ee), (0x05f5, 0x05ff), (0x070e, 0x070e),
+    (0x074b, 0x074c), (0x07b2, 0x07bf), (0x07fb, 0x07fc), (0x082e, 0x082f),
+    (0x083f, 0x083f), (0x085c, 0x085d), (0x085f, 0x085f), (0x086b, 0x086f),
+    (0x088f, 0x088f), (0x0892, 0x0897), (0x0984, 0x0984), (0x098d, 0x098e),
+    (0x0991, 0x0992), (0x09a9, 0x09a9), (0x09b1, 0x09b1), (0x09b3, 0x09b5),
+    (0x09ba, 0x09bb), (0x09c5, 0x09c6), (0x09c9, 0x09ca), (0x09cf, 0x09d6),
+    (0x09d8, 0x09db), (0x09de, 0x09de), (0x09e4, 0x09e5), (0x09ff, 0x0a00),
+    (0x0a04, 0x0a04), (0x0a0b, 0x0a0e), (0x0a11, 0x0a12), (0x0a29, 0x0a29),
+    (0x0a31, 0x0a31), (0x0a34, 0x0a34), (0x0a37, 0x0a37), (0x0a3a, 0x0a3b),
+    (0x0a3d, 0x0a3d), (0x0a43, 0x0a46), (0x0a49, 0x0a4a), (0x0a4e, 0x0a50),
+    (0x0a52, 0x0a58), (0x0a5d, 0x0a5d), (0x0a5f, 0x0a65), (0x0a77, 0x0a80),
+    (0x0a84, 0x0a84), (0x0a8e, 0x0a8e), (0x0a92, 0x0a92), (0x0aa9, 0x0aa9),
+    (0x0ab1, 0x0ab1), (0x0ab4, 0x0ab4), (0x0aba, 0x0abb), (0x0ac6, 0x0ac6),
+    (0x0aca, 0x0aca), (0x0ace, 0x0acf), (0x0ad1, 0x0adf), (0x0ae4, 0x0ae5),
+    (0x0af2, 0x0af8), (0x0b00, 0x0b00), (0x0b04, 0x0b04), (0x0b0d, 0x0b0e),
+    (0x0b11, 0x0b12), (0x0b29, 0x0b29), (0x0b31, 0x0b31), (0x0b34, 0x0b34),
+    (0x0b3a, 0x0b3b), (0x0b45, 0x0b46), (0x0b49, 0x0b4a), (0x0b4e, 0x0b54),
+    (0x0b58, 0x0b5b), (0x0b5e, 0x0b5e), (0x0b64, 0x0b65), (0x0b78, 0x0b81),
+    (0x0b84, 0x0b84), (0x0b8b, 0x0b8d), (0x0b91, 0x0b91), (0x0b96, 0x0b98),
+    (0x0b9b, 0x0b9b), (0x0b9d, 0x0b9d), (0x0ba0, 0x0ba2), (0x0ba5, 0x0ba7),
+    (0x0bab, 0x0bad), (0x0bba, 0x0bbd), (0x0bc3, 0x0bc5), (0x0bc9, 0x0bc9),
+    (0x0bce, 0x0bcf), (0x0bd1, 0x0bd6), (0x0bd8, 0x0be5), (0x0bfb, 0x0bff),
+    (0x0c0d, 0x0c0d), (0x0c11, 0x0c11), (0x0c29, 0x0c29), (0x0c3a, 0x0c3b),
+    (0x0c45, 0x0c45), (0x0c49, 0x0c49), (0x0c4e, 0x0c54), (0x0c57, 0x0c57),
+    (0x0c5b, 0x0c5c), (0x0c5e, 0x0c5f), (0x0c64, 0x0c65), (0x0c70, 0x0c76),
+    (0x0c8d, 0x0c8d), (0x0c91, 0x0c91), (0x0ca9, 0x0ca9), (0x0cb4, 0x0cb4),
+    (0x0cba, 0x0cbb), (0x0cc5, 0x0cc5), (0x0cc9, 0x0cc9), (0x0cce, 0x0cd4),
+    (0x0cd7, 0x0cdc), (0x0cdf, 0x0cdf), (0x0ce4, 0x0ce5), (0x0cf0, 0x0cf0),
+    (0x0cf3, 0x0cff), (0x0d0d, 0x0d0d), (0x0d11, 0x0d11), (0x0d45, 0x0d45),
+    (0x0d49, 0x0d49), (0x0d50, 0x0d53), (0x0d64, 0x0d65), (0x0d80, 0x0d80),
+    (0x0d84, 0x0d84), (0x0d97, 0x0d99), (0x0db2, 0x0db2), (0x0dbc, 0x0dbc),
+    (0x0dbe, 0x0dbf), (0x0dc7, 0x0dc9), (0x0dcb, 0x0dce), (0x0dd5, 0x0dd5),
+    (0x0dd7, 0x0dd7), (0x0de0, 0x0de5), (0x0df0, 0x0df1), (0x0df5, 0x0e00),
+    (0x0e3b, 0x0e3e), (0x0e5c, 0x0e80), (0x0e83, 0x0e83), (0x0e85, 0x0e85),
+    (0x0e8b, 0x0e8b), (0x0ea4, 0x0ea4), (0x0ea6, 0x0ea6), (0x0ebe, 0x0ebf),
+    (0x0ec5, 0x0ec5), (0x0ec7, 0x0ec7), (0x0ece, 0x0ecf), (0x0eda, 0x0edb),
+    (0x0ee0, 0x0eff), (0x0f48, 0x0f48), (0x0f6d, 0x0f70), (0x0f98, 0x0f98),
+    (0x0fbd, 0x0fbd), (0x0fcd, 0x0fcd), (0x0fdb, 0x0fff), (0x10c6, 0x10c6),
+    (0x10c8, 0x10cc), (0x10ce, 0x10cf), (0x1100, 0x115f), (0x1249, 0x1249),
+    (0x124e, 0x124f), (0x1257, 0x1257), (0x1259, 0x1259), (0x125e, 0x125f),
+    (0x1289, 0x1289), (0x128e, 0x128f), (0x12b1, 0x12b1), (0x12b6, 0x12b7),
+    (0x12bf, 0x12bf), (0x12c1, 0x12c1), (0x12c6, 0x12c7), (0x12d7, 0x12d7),
+    (0x1311, 0x1311), (0x1316, 0x1317), (0x135b, 0x135c), (0x137d, 0x137f),
+    (0x139a, 0x139f), (0x13f6, 0x13f7), (0x13fe, 0x13ff), (0x169d, 0x169f),
+    (0x16f9, 0x16ff), (0x1716, 0x171e), (0x1737, 0x173f), (0x1754, 0x175f),
+    (0x176d, 0x176d), (0x1771, 0x1771), (0x1774, 0x177f), (0x17de, 0x17df),
+    (0x17ea, 0x17ef), (0x17fa, 0x17ff), (0x181a, 0x181f), (0x1879, 0x187f),
+    (0x18ab, 0x18af), (0x18f6, 0x18ff), (0x191f, 0x191f), (0x192c, 0x192f),
+    (0x193c, 0x193f), (0x1941, 0x1943), (0x196e, 0x196f), (0x1975, 0x197f),
+    (0x19ac, 0x19af), (0x19ca, 0x19cf), (0x19db, 0x19dd), (0x1a1c, 0x1a1d),
+    (0x1a5f, 0x1a5f), (0x1a7d, 0x1a7e), (0x1a8a, 0x1a8f), (0x1a9a, 0x1a9f),
+    (0x1aae, 0x1aaf), (0x1acf, 0x1aff), (0x1b4d, 0x1b4f), (0x1b7f, 0x1b7f),
+    (0x1bf4, 0x1bfb), (0x1c38, 0x1c3a), (0x1c4a, 0x1c4c), (0x1c89, 0x1c8f),
+    (0x1cbb, 0x1cbc), (0x1cc8, 0x1ccf), (0x1cfb, 0x1cff), (0x1f16, 0x1f17),
+    (0x1f1e, 0x1f1f), (0x1f46, 0x1f47), (0x1f4e, 0x1f4f), (0x1f58, 0x1f58),
+    (0x1f5a, 0x1f5a), (0x1f5c, 0x1f5c), (0x1f5e, 0x1f5e), (0x1f7e, 0x1f7f),
+    (0x1fb5, 0x1fb5), (0x1fc5, 0x1fc5), (0x1fd4, 0x1fd5), (0x1fdc, 0x1fdc),
+    (0x1ff0, 0x1ff1), (0x1ff5, 0x1ff5), (0x1fff, 0x1fff), (0x2010, 0x2010),
+    (0x2013, 0x2016), (0x2018, 0x2019), (0x201c, 0x201d), (0x2020, 0x2022),
+    (0x2024, 0x2027), (0x2030, 0x2030), (0x2032, 0x2033), (0x2035, 0x2035),
+    (0x203b, 0x203b), (0x203e, 0x203e), (0x2065, 0x2065), (0x2072, 0x2074),
+    (0x207f, 0x207f), (0x2081, 0x2084), (0x208f, 0x208f), (0x209d, 0x209f),
+    (0x20ac, 0x20ac), (0x20c1, 0x20cf), (0x20f1, 0x20ff), (0x2103, 0x2103),
+    (0x2105, 0x2105), (0x2109, 0x2109), (0x2113, 0x2113), (0x2116, 0x2116),
+    (0x2121, 0x2122), (0x2126, 0x2126), (0x212b, 0x212b), (0x2153, 0x2154),
+    (0x215b, 0x215e), (0x2160, 0x216b), (0x2170, 0x2179), (0x2189, 0x2189),
+    (0x218c, 0x2199), (0x21b8, 0x21b9), (0x21d2, 0x21d2), (0x21d4, 0x21d4),
+    (0x21e7, 0x21e7), (0x2200, 0x2200), (0x2202, 0x2203), (0x2207, 0x2208),
+    (0x220b, 0x220b), (0x220f, 0x220f), (0x2211, 0x2211), (0x2215, 0x2215),
+    (0x221a, 0x221a), (0x221d, 0x2220), (0x2223, 0x2223), (0x2225, 0x2225),
+    (0x2227, 0x222c), (0x222e, 0x222e), (0x2234, 0x2237), (0x223c, 0x223d),
+    (0x2248, 0x2248), (0x224c, 0x224c), (0x2252, 0x2252), (0x2260, 0x2261),
+    (0x2264, 0x2267), (0x226a, 0x226b), (0x226e, 0x226f), (0x2282, 0x2283),
+    (0x2286, 0x2287), (0x2295, 0x2295), (0x2299, 0x2299), (0x22a5, 0x22a5),
+    (0x22bf, 0x22bf), (0x2312, 0x2312), (0x231a, 0x231b), (0x2329, 0x232a),
+    (0x23e9, 0x23ec), (0x23f0, 0x23f0), (0x23f3, 0x23f3), (0x2427, 0x243f),
+    (0x244b, 0x24e9), (0x24eb, 0x254b), (0x2550, 0x2573), (0x2580, 0x258f),
+    (0x2592, 0x2595), (0x25a0, 0x25a1), (0x25a3, 0x25a9), (0x25b2, 0x25b3),
+    (0x25b6, 0x25b7), (0x25bc, 0x25bd), (0x25c0, 0x25c1), (0x25c6, 0x25c8),
+    (0x25cb, 0x25cb), (0x25ce, 0x25d1), (0x25e2, 0x25e5), (0x25ef, 0x25ef),
+    (0x25fd, 0x25fe), (0x2605, 0x2606), (0x2609, 0x2609), (0x260e, 0x260f),
+    (0x2614, 0x2615), (0x261c, 0x261c), (0x261e, 0x261e), (0x2640, 0x2640),
+    (0x2642, 0x2642), (0x2648, 0x2653), (0x2660, 0x2661), (0x2663, 0x2665),
+    (0x2667, 0x266a), (0x266c, 0x266d), (0x266f, 0x266f), (0x267f, 0x267f),
+    (0x2693, 0x2693), (0x269e, 0x269f), (0x26a1, 0x26a1), (0x26aa, 0x26ab),
+    (0x26bd, 0x26bf), (0x26c4, 0x26e1), (0x26e3, 0x26e3), (0x26e8, 0x26ff),
+    (0x2705, 0x2705), (0x270a, 0x270b), (0x2728, 0x2728), (0x273d, 0x273d),
+    (0x274c, 0x274c), (0x274e, 0x274e), (0x2753, 0x2755), (0x2757, 0x2757),
+    (0x2776, 0x277f), (0x2795, 0x2797), (0x27b0, 0x27b0), (0x27bf, 0x27bf),
+    (0x2b1b, 0x2b1c), (0x2b50, 0x2b50), (0x2b55, 0x2b59), (0x2b74, 0x2b75),
+    (0x2b96, 0x2b96), (0x2cf4, 0x2cf8), (0x2d26, 0x2d26), (0x2d28, 0x2d2c),
+    (0x2d2e, 0x2d2f), (0x2d68, 0x2d6e), (0x2d71, 0x2d7e), (0x2d97, 0x2d9f),
+    (0x2da7, 0x2da7), (0x2daf, 0x2daf), (0x2db7, 0x2db7), (0x2dbf, 0x2dbf),
+    (0x2dc7, 0x2dc7), (0x2dcf, 0x2dcf), (0x2dd7, 0x2dd7), (0x2ddf, 0x2ddf),
+    (0x2e5e, 0x303e), (0x3040, 0x4dbf), (0x4e00, 0xa4cf), (0xa62c, 0xa63f),
+    (0xa6f8, 0xa6ff), (0xa7cb, 0xa7cf), (0xa7d2, 0xa7d2), (0xa7d4, 0xa7d4),
+    (0xa7da, 0xa7f1), (0xa82d, 0xa82f), (0xa83a, 0xa83f), (0xa878, 0xa87f),
+    (0xa8c6, 0xa8cd), (0xa8da, 0xa8df), (0xa954, 0xa95e), (0xa960, 0xa97f),
+    (0xa9ce, 0xa9ce), (0xa9da, 0xa9dd), (0xa9ff, 0xa9ff), (0xaa37, 0xaa3f),
+    (0xaa4e, 0xaa4f), (0xaa5a, 0xaa5b), (0xaac3, 0xaada), (0xaaf7, 0xab00),
+    (0xab07, 0xab08), (0xab0f, 0xab10), (0xab17, 0xab1f), (0xab27, 0xab27),
+    (0xab2f, 0xab2f), (0xab6c, 0xab6f), (0xabee, 0xabef), (0xabfa, 0xd7af),
+    (0xd7c7, 0xd7ca), (0xd7fc, 0xd7ff), (0xe000, 0xfaff), (0xfb07, 0xfb12),
+    (0xfb18, 0xfb1c), (0xfb37, 0xfb37), (0xfb3d, 0xfb3d), (0xfb3f, 0xfb3f),
+    (0xfb42, 0xfb42), (0xfb45, 0xfb45), (0xfbc3, 0xfbd2), (0xfd90, 0xfd91),
+    (0xfdc8, 0xfdce), (0xfdd0, 0xfdef), (0xfe00, 0xfe1f), (0xfe30, 0xfe6f),
+    (0xfe75, 0xfe75), (0xfefd, 0xfefe), (0xff00, 0xff60), (0xffbf, 0xffc1),
+    (0xffc8, 0xffc9), (0xffd0, 0xffd1), (0xffd8, 0xffd9), (0xffdd, 0xffe7),
+    (0xffef, 0xfff8), (0xfffd, 0xffff), (0x1000c, 0x1000c), (0x10027, 0x10027),
+    (0x1003b, 0x1003b), (0x1003e, 0x1003e), (0x1004e, 0x1004f),
+    (0x1005e, 0x1007f), (0x100fb, 0x100ff), (0x10103, 0x10106),
+    (0x10134, 0x10136), (0x1018f, 0x1018f), (0x1019d, 0x1019f),
+    (0x101a1, 0x101cf), (0x101fe, 0x1027f), (0x1029d, 0x1029f),
+    (0x102d1, 0x102df), (0x102fc, 0x102ff), (0x10324, 0x1032c),
+    (0x1034b, 0x1034f), (0x1037b, 0x1037f), (0x1039e, 0x1039e),
+    (0x103c4, 0x103c7), (0x103d6, 0x103ff), (0x1049e, 0x1049f),
+    (0x104aa, 0x104af), (0x104d4, 0x104d7), (0x104fc, 0x104ff),
+    (0x10528, 0x1052f), (0x10564, 0x1056e), (0x1057b, 0x1057b),
+    (0x1058b, 0x1058b), (0x10593, 0x10593), (0x10596, 0x10596),
+    (0x105a2, 0x105a2), (0x105b2, 0x105b2), (0x105ba, 0x105ba),
+    (0x105bd, 0x105ff), (0x10737, 0x1073f), (0x10756, 0x1075f),
+    (0x10768, 0x1077f), (0x10786, 0x10786), (0x107b1, 0x107b1),
+    (0x107bb, 0x107ff), (0x10806, 0x10807), (0x10809, 0x10809),
+    (0x10836, 0x10836), (0x10839, 0x1083b), (0x1083d, 0x1083e),
+    (0x10856, 0x10856), (0x1089f, 0x108a6), (0x108b0, 0x108df),
+    (0x108f3, 0x108f3), (0x108f6, 0x108fa), (0x1091c, 0x1091e),
+    (0x1093a, 0x1093e), (0x10940, 0x1097f), (0x109b8, 0x109bb),
+    (0x109d0, 0x109d1), (0x10a04, 0x10a04), (0x10a07, 0x10a0b),
+    (0x10a14, 0x10a14), (0x10a18, 0x10a18), (0x10a36, 0x10a37),
+    (0x10a3b, 0x10a3e), (0x10a49, 0x10a4f), (0x10a59, 0x10a5f),
+    (0x10aa0, 0x10abf), (0x10ae7, 0x10aea), (0x10af7, 0x10aff),
+    (0x10b36, 0x10b38), (0x10b56, 0x10b57), (0x10b73, 0x10b77),
+    (0x10b92, 0x10b98), (0x10b9d, 0x10ba8), (0x10bb0, 0x10bff),
+    (0x10c49, 0x10c7f), (0x10cb3, 0x10cbf), (0x10cf3, 0x10cf9),
+    (0x10d28, 0x10d2f), (0x10d3a, 0x10e5f), (0x10e7f, 0x10e7f),
+    (0x10eaa, 0x10eaa), (0x10eae, 0x10eaf), (0x10eb2, 0x10eff),
+    (0x10f28, 0x10f2f), (0x10f5a, 0x10f6f), (0x10f8a, 0x10faf),
+    (0x10fcc, 0x10fdf), (0x10ff7, 0x10fff), (0x1104e, 0x11051),
+    (0x11076, 0x1107e), (0x110c3, 0x110cc), (0x110ce, 0x110cf),
+    (0x110e9, 0x110ef), (0x110fa, 0x110ff), (0x11135, 0x11135),
+    (0x11148, 0x1114f), (0x11177, 0x1117f), (0x111e0, 0x111e0),
+    (0x111f5, 0x111ff), (0x11212, 0x11212), (0x1123f, 0x1127f),
+    (0x11287, 0x11287), (0x11289, 0x11289), (0x1128e, 0x1128e),
+    (0x1129e, 0x1129e), (0x112aa, 0x112af), (0x112eb, 0x112ef),
+    (0x112fa, 0x112ff), (0x11304, 0x11304), (0x1130d, 0x1130e),
+    (0x11311, 0x11312), (0x11329, 0x11329), (0x11331, 0x11331),
+    (0x11334, 0x11334), (0x1133a, 0x1133a), (0x11345, 0x11346),
+    (0x11349, 0x1134a), (0x1134e, 0x1134f), (0x11351, 0x11356),
+    (0x11358, 0x1135c), (0x11364, 0x11365), (0x1136d, 0x1136f),
+    (0x11375, 0x113ff), (0x1145c, 0x1145c), (0x11462, 0x1147f),
+    (0x114c8, 0x114cf), (0x114da, 0x1157f), (0x115b6, 0x115b7),
+    (0x115de, 0x115ff), (0x11645, 0x1164f), (0x1165a, 0x1165f),
+    (0x1166d, 0x1167f), (0x116ba, 0x116bf), (0x116ca, 0x116ff),
+    (0x1171b, 0x1171c), (0x1172c, 0x1172f), (0x11747, 0x117ff),
+    (0x1183c, 0x1189f), (0x118f3, 0x118fe), (0x11907, 0x11908),
+    (0x1190a, 0x1190b), (0x11914, 0x11914), (0x11917, 0x11917),
+    (0x11936, 0x11936), (0x11939, 0x1193a), (0x11947, 0x1194f),
+    (0x1195a, 0x1199f), (0x119a8, 0x119a9), (0x119d8, 0x119d9),
+    (0x119e5, 0x119ff), (0x11a48, 0x11a4f), (0x11aa3, 0x11aaf),
+    (0x11af9, 0x11bff), (0x11c09, 0x11c09), (0x11c37, 0x11c37),
+    (0x11c46, 0x11c4f), (0x11c6d, 0x11c6f), (0x11c90, 0x11c91),
+    (0x11ca8, 0x11ca8), (0x11cb7, 0x11cff), (0x11d07, 0x11d07),
+    (0x11d0a, 0x11d0a), (0x11d37, 0x11d39), (0x11d3b, 0x11d3b),
+    (0x11d3e, 0x11d3e), (0x11d48, 0x11d4f), (0x11d5a, 0x11d5f),
+    (0x11d66, 0x11d66), (0x11d69, 0x11d69), (0x11d8f, 0x11d8f),
+    (0x11d92, 0x11d92), (0x11d99, 0x11d9f), (0x11daa, 0x11edf),
+    (0x11ef9, 0x11faf), (0x11fb1, 0x11fbf), (0x11ff2, 0x11ffe),
+    (0x1239a, 0x123ff), (0x1246f, 0x1246f), (0x12475, 0x1247f),
+    (0x12544, 0x12f8f), (0x12ff3, 0x12fff), (0x1342f, 0x1342f),
+    (0x13439, 0x143ff), (0x14647, 0x167ff), (0x16a39, 0x16a3f),
+    (0x16a5f, 0x16a5f), (0x16a6a, 0x16a6d), (0x16abf, 0x16abf),
+    (0x16aca, 0x16acf), (0x16aee, 0x16aef), (0x16af6, 0x16aff),
+    (0x16b46, 0x16b4f), (0x16b5a, 0x16b5a), (0x16b62, 0x16b62),
+    (0x16b78, 0x16b7c), (0x16b90, 0x16e3f), (0x16e9b, 0x16eff),
+    (0x16f4b, 0x16f4e), (0x16f88, 0x16f8e), (0x16fa0, 0x1bbff),
+    (0x1bc6b, 0x1bc6f), (0x1bc7d, 0x1bc7f), (0x1bc89, 0x1bc8f),
+    (0x1bc9a, 0x1bc9b), (0x1bca4, 0x1ceff), (0x1cf2e, 0x1cf2f),
+    (0x1cf47, 0x1cf4f), (0x1cfc4, 0x1cfff), (0x1d0f6, 0x1d0ff),
+    (0x1d127, 0x1d128), (0x1d1eb, 0x1d1ff), (0x1d246, 0x1d2df),
+    (0x1d2f4, 0x1d2ff), (0x1d357, 0x1d35f), (0x1d379, 0x1d3ff),
+    (0x1d455, 0x1d455), (0x1d49d, 0x1d49d), (0x1d4a0, 0x1d4a1),
+    (0x1d4a3, 0x1d4a4), (0x1d4a7, 0x1d4a8), (0x1d4ad, 0x1d4ad),
+    (0x1d4ba, 0x1d4ba), (0x1d4bc, 0x1d4bc), (0x1d4c4, 0x1d4c4),
+    (0x1d506, 0x1d506), (0x1d50b, 0x1d50c), (0x1d515, 0x1d515),
+    (0x1d51d, 0x1d51d), (0x1d53a, 0x1d53a), (0x1d53f, 0x1d53f),
+    (0x1d545, 0x1d545), (0x1d547, 0x1d549), (0x1d551, 0x1d551),
+    (0x1d6a6, 0x1d6a7), (0x1d7cc, 0x1d7cd), (0x1da8c, 0x1da9a),
+    (0x1daa0, 0x1daa0), (0x1dab0, 0x1deff), (0x1df1f, 0x1dfff),
+    (0x1e007, 0x1e007), (0x1e019, 0x1e01a), (0x1e022, 0x1e022),
+    (0x1e025, 0x1e025), (0x1e02b, 0x1e0ff), (0x1e12d, 0x1e12f),
+    (0x1e13e, 0x1e13f), (0x1e14a, 0x1e14d), (0x1e150, 0x1e28f),
+    (0x1e2af, 0x1e2bf), (0x1e2fa, 0x1e2fe), (0x1e300, 0x1e7df),
+    (0x1e7e7, 0x1e7e7), (0x1e7ec, 0x1e7ec), (0x1e7ef, 0x1e7ef),
+    (0x1e7ff, 0x1e7ff), (0x1e8c5, 0x1e8c6), (0x1e8d7, 0x1e8ff),
+    (0x1e94c, 0x1e94f), (0x1e95a, 0x1e95d), (0x1e960, 0x1ec70),
+    (0x1ecb5, 0x1ed00), (0x1ed3e, 0x1edff), (0x1ee04, 0x1ee04),
+    (0x1ee20, 0x1ee20), (0x1ee23, 0x1ee23), (0x1ee25, 0x1ee26),
+    (0x1ee28, 0x1ee28), (0x1ee33, 0x1ee33), (0x1ee38, 0x1ee38),
+    (0x1ee3a, 0x1ee3a), (0x1ee3c, 0x1ee41), (0x1ee43, 0x1ee46),
+    (0x1ee48, 0x1ee48), (0x1ee4a, 0x1ee4a), (0x1ee4c, 0x1ee4c),
+    (0x1ee50, 0x1ee50), (0x1ee53, 0x1ee53), (0x1ee55, 0x1ee56),
+    (0x1ee58, 0x1ee58), (0x1ee5a, 0x1ee5a), (0x1ee5c, 0x1ee5c),
+    (0x1ee5e, 0x1ee5e), (0x1ee60, 0x1ee60), (0x1ee63, 0x1ee63),
+    (0x1ee65, 0x1ee66), (0x1ee6b, 0x1ee6b), (0x1ee73, 0x1ee73),
+    (0x1ee78, 0x1ee78), (0x1ee7d, 0x1ee7d), (0x1ee7f, 0x1ee7f),
+    (0x1ee8a, 0x1ee8a), (0x1ee9c, 0x1eea0), (0x1eea4, 0x1eea4),
+    (0x1eeaa, 0x1eeaa), (0x1eebc, 0x1eeef), (0x1eef2, 0x1efff),
+    (0x1f004, 0x1f004), (0x1f02c, 0x1f02f), (0x1f094, 0x1f09f),
+    (0x1f0af, 0x1f0b0), (0x1f0c0, 0x1f0c0), (0x1f0cf, 0x1f0d0),
+    (0x1f0f6, 0x1f10a), (0x1f110, 0x1f12d), (0x1f130, 0x1f169),
+    (0x1f170, 0x1f1ac), (0x1f1ae, 0x1f1e5), (0x1f200, 0x1f320),
+    (0x1f32d, 0x1f335), (0x1f337, 0x1f37c), (0x1f37e, 0x1f393),
+    (0x1f3a0, 0x1f3ca), (0x1f3cf, 0x1f3d3), (0x1f3e0, 0x1f3f0),
+    (0x1f3f4, 0x1f3f4), (0x1f3f8, 0x1f43e), (0x1f440, 0x1f440),
+    (0x1f442, 0x1f4fc), (0x1f4ff, 0x1f53d), (0x1f54b, 0x1f54e),
+    (0x1f550, 0x1f567), (0x1f57a, 0x1f57a), (0x1f595, 0x1f596),
+    (0x1f5a4, 0x1f5a4), (0x1f5fb, 0x1f64f), (0x1f680, 0x1f6c5),
+    (0x1f6cc, 0x1f6cc), (0x1f6d0, 0x1f6d2), (0x1f6d5, 0x1f6df),
+    (0x1f6eb, 0x1f6ef), (0x1f6f4, 0x1f6ff), (0x1f774, 0x1f77f),
+    (0x1f7d9, 0x1f7ff), (0x1f80c, 0x1f80f), (0x1f848, 0x1f84f),
+    (0x1f85a, 0x1f85f), (0x1f888, 0x1f88f), (0x1f8ae, 0x1f8af),
+    (0x1f8b2, 0x1f8ff), (0x1f90c, 0x1f93a), (0x1f93c, 0x1f945),
+    (0x1f947, 0x1f9ff), (0x1fa54, 0x1fa5f), (0x1fa6e, 0x1faff),
+    (0x1fb93, 0x1fb93), (0x1fbcb, 0x1fbef), (0x1fbfa, 0xe0000),
+    (0xe0002, 0xe001f), (0xe0080, 0x10ffff),
+)
+WIDE_STARTS = tuple(first for first, _ in WIDE_RANGES)
+WIDE_ENDS = tuple(last for _, last in WIDE_RANGES)
+# Text made of characters below this one only has one column characters.
+FIRST_WIDE_CHAR = u'\u00a1'
+ESC = u'\x1b'
+ANSI_ESCAPE = re.compile(u'(\x1b\\[[0-9;]*[A-Za-z])')
+
+
+def is_wide(c):
+    """Check if a character takes two columns.
+
+    :type c: str
+    :param c: The character.
+
+    :rtype: bool
+    :return: True for fullwidth, wide and ambiguous characters.
+    """
+    if c < FIRST_WIDE_CHAR:
+        return False
+    code = ord(c)
+    index = bisect_right(WIDE_STARTS, code) - 1
+    return index >= 0 and code <= WIDE_ENDS[index]
+
+
+class CharWidths(dict):
+    """Map characters to their width, looking each up in the table once."""
+
+    def __missing__(self, c):
+        width = self[c] = 2 if is_wide(c) else 1
+        return width
+
+
+_char_widths = CharWidths()
+
+try:
+    # Python 3.7+ keeps whether a str is ASCII, so this takes no pass over it.
+    _is_narrow = type(u'').isascii
+except AttributeError:
+    def _is_narrow(text):
+        return max(text) < FIRST_WIDE_CHAR
+
+
+def char_width(c):
+    """Get the columns a character takes.
+
+    :type c: str
+    :param c: The character.
+
+    :rtype: int
+    :return: 2 for fullwidth, wide and ambiguous characters, 1 otherwise.
+    """
+    return _char_widths[c]
+
+
+def strip_ansi(text):
+    """Remove the ANSI escapes from a text.
+
+    :type text: str
+    :param text: The text.
+
+    :rtype: str
+    :return: The text as displayed.
+    """
+    if ESC not in text:
+        return text
+    return ANSI_ESCAPE.sub(u'', text)
+
+
+def visible_width(text):
+    """Get the columns a text without ANSI escapes takes.
+
+    :type text: str
+    :param text: The text, already stripped of ANSI escapes.
+
+    :rtype: int
+    :return: The display width of the text.
+    """
+    if not text or _is_narrow(text):
+        return len(text)
+    return sum(map(_char_widths.__getitem__, text))
+
+
+def text_width(text):
+    """Get the columns a text takes.
+
+    :type text: str
+    :param text: The text, ANSI escapes are not counted.
+
+    :rtype: int
+    :return: The display width of the text.
+    """
+    return visible_width(strip_ansi(text))
+
+
+def _break_word(word, parts, column, width, indent, newline):
+    """Add a word to parts character by character, breaking it at width.
+
+    :rtype: int
+    :return: The column after the word.
+    """
+    tokens = ANSI_ESCAPE.split(word) if ESC in word else [word]
+    for token in tokens:
+        if token.startswith(ESC):
+            parts.append(token)
+            continue
+        for c in token:
+            c_width = _char_widths[c]
+            if column + c_width > width and column > indent:
+                if parts and parts[-1] == u' ':
+                    parts.pop()
+                parts.append(newline)
+                column = indent
+            parts.append(c)
+            column += c_width
+    return column
+
+
+def wrap_text(text, width, indent=0):
+    """Wrap a text to the given width.
+
+    Lines are broken at spaces, and words with wide characters, which are
+    written without spaces, or wider than a line are broken anywhere. Each
+    word is measured once and the lines are joined at the end.
+
+    :type text: str
+    :param text: The text, ANSI escapes are not counted.
+
+    :type width: int
+    :param width: The columns of a line, the indent included.
+
+    :type indent: int
+    :param indent: The column every line starts at. The indent is written
+        before every line but the first.
+
+    :rtype: str
+    :return: The wrapped text.
+    """
+    newline = u'\n' + u' ' * indent
+    parts = []
+    column = indent
+    for word in text.split(u' '):
+        visible = strip_ansi(word)
+        word_width = visible_width(visible)
+        space = 1 if column > indent else 0
+        if column + space + word_width > width:
+            if word_width == len(visible) and indent + word_width <= width:
+                parts.append(newline)
+                column = indent
+                space = 0
+            else:
+                if space:
+                    parts.append(u' ')
+                column = _break_word(word, parts, column + space, width, indent, newline)
+                continue
+        if space:
+            parts.append(u' ')
+        parts.append(word)
+        column += space + word_width
+    return u''.join(parts)
+
+
+def generate_wide_ranges():
+    """Generate WIDE_RANGES from the running Python's `unicodedata`.
+
+    :rtype: list
+    :return: The (first, last) code point ranges of two column characters.
+    """
+    import sys
+    import unicodedata
+    try:
+        to_char = unichr
+    except NameError:
+        to_char = chr
+    ranges = []
+    first = None
+    for code in range(sys.maxunicode + 1):
+        if unicodedata.east_asian_width(to_char(code)) in 'FWA':
+            if first is None:
+                first = code
+        elif first is not None:
+            ranges.append((first, code - 1))
+            first = None
+    if first is not None:
+        ranges.append((first, sys.maxunicode))
+    return ranges
+
+
+if __name__ == '__main__':
+    import unicodedata
+    print("UNICODE_VERSION = '{0}'".format(unicodedata.unidata_version))
+    line = '   '
+    for first, last in generate_wide_ranges():
+        item = ' (0x{0:04x}, 0x{1:04x}),'.format(first, last)
+        if len(line) + len(item) > 79:
+            print(line)
+            line = '   '
+        line += item
+    print(line)
@@ -18,12 +18,15 @@ setup(
     version=__version__,
     license='Apache License 2.0',
     install_requires=[
+        'beautifulsoup4>=4.4.0,<5.0.0',
         'click>=5.1,<7.0',
         'colorama>=0.3.3,<1.0.0',
         'requests>=2.4.3,<3.0.0',
+        'lxml>=3.5.0,<5.0.0',
         'pygments>=2.0.2,<3.0.0',
         'prompt-toolkit>=1.0.0,<1.1.0',
         'six>=1.9.0,<2.0.0',
+        'futures>=3.0.0,<4.0.0; python_version < "3.2"',
     ],
     extras_require={
         'testing': [